@@ -0,0 +1,97 @@
+from dataclasses import dataclass
+from json import dumps
+from random import Random
+from typing import Any, Iterator
+
+from sqlalchemy.orm import Session
+
+from departments.imports_db import OrgImporter
+
+
+@dataclass(frozen=True)
+class OrgShape:
+    employees: int = 10000
+    depth: int = 4
+    fan_out: int = 5
+    roles_per_department: int = 5
+    roles_per_employee: int = 2
+    permissions: int = 50
+    permissions_per_role: int = 5
+    seed: int = 0
+
+
+@dataclass(frozen=True)
+class OrgSample:
+    root: int
+    department: int
+    employee: int
+    role: int
+    permission: int
+
+
+def department_keys(shape: OrgShape) -> list[tuple[str, str | None]]:
+    departments: list[tuple[str, str | None]] = [("d0", None)]
+    level: list[str] = ["d0"]
+    for _ in range(1, shape.depth):
+        children: list[str] = []
+        for parent in level:
+            for index in range(shape.fan_out):
+                children.append(f"{parent}.{index}")
+                departments.append((children[-1], parent))
+        level = children
+    return departments
+
+
+def generate_records(shape: OrgShape) -> Iterator[dict[str, Any]]:
+    random: Random = Random(shape.seed)
+    departments: list[tuple[str, str | None]] = department_keys(shape)
+    for key, parent in departments:
+        yield {"type": "department", "key": key, "name": f"department-{key}", "parent": parent}
+
+    permissions: list[str] = [f"p{index}" for index in range(shape.permissions)]
+    for key in permissions:
+        yield {"type": "permission", "key": key, "name": f"permission-{key[1:]}"}
+
+    for department, _ in departments:
+        for index in range(shape.roles_per_department):
+            role: str = f"r{department}-{index}"
+            yield {"type": "role", "key": role, "name": f"role-{index}", "department": department}
+            for permission in random.sample(permissions, min(shape.permissions_per_role, len(permissions))):
+                yield {"type": "role_permission", "role": role, "permission": permission}
+
+    roles_per_employee: int = min(shape.roles_per_employee, shape.roles_per_department)
+    for index in range(shape.employees):
+        employee: str = f"e{index}"
+        department: str = departments[random.randrange(len(departments))][0]
+        yield {
+            "type": "employee",
+            "key": employee,
+            "name": f"name-{index}",
+            "surname": f"surname-{index}",
+            "department": department,
+        }
+        for role in random.sample(range(shape.roles_per_department), roles_per_employee):
+            yield {"type": "employee_role", "employee": employee, "role": f"r{department}-{role}"}
+
+
+def load_org(db: Session, shape: OrgShape, chunk_size: int = 20000) -> OrgSample:
+    importer: OrgImporter = OrgImporter(db)
+    lines: list[tuple[int, bytes]] = []
+    for number, record in enumerate(generate_records(shape), start=1):
+        lines.append((number, dumps(record).encode()))
+        if len(lines) >= chunk_size:
+            importer.load(lines)
+            lines = []
+    if lines:
+        importer.load(lines)
+    if importer.failed:
+        raise ValueError(f"Synthetic org rejected {importer.failed} records: {importer.errors[:5]}")
+
+    leaf: str = department_keys(shape)[-1][0]
+    return OrgSample(
+        root=importer.keys["department"]["d0"],
+        department=importer.keys["department"][leaf],
+        employee=importer.keys["employee"]["e0"],
+        role=importer.keys["role"][f"r{leaf}-0"],
+        permission=importer.keys["permission"]["p0"],
+    )
@@ -0,0 +1,493 @@
+from argparse import ArgumentParser, Namespace
+from dataclasses import asdict, dataclass
+from json import dump, load
+from pathlib import Path
+from platform import python_version
+from sqlite3 import sqlite_version
+from time import perf_counter, perf_counter_ns
+from typing import Any, Callable
+
+import fastapi
+import sqlalchemy
+from fastapi import FastAPI
+from fastapi.routing import APIRoute
+from fastapi.testclient import TestClient
+from sqlalchemy import Engine, create_engine, event, func, select
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+from benchmarks.generator import OrgSample, OrgShape, load_org
+from common.abstracts import MAX_PAGE_SIZE
+from common.cache import identity_cache
+from common.database import Base, apply_read_pragmas, apply_write_pragmas, configure
+from common.database import get_db, get_read_db, get_async_db
+from common.migrations import migrate
+from departments.permissions_db import permission_cache
+from main import create_app
+
+Request = tuple[str, dict[str, Any]]
+
+BULK_SIZE = 100
+
+
+@dataclass(frozen=True)
+class Case:
+    method: str
+    route: str
+    request: Callable[[TestClient, OrgSample, int], Request]
+    iterations: int | None = None
+    variant: str = ""
+
+
+def created(client: TestClient, url: str, body: dict[str, Any]) -> int:
+    return client.post(url, json=body).json()["id"]
+
+
+def subtree(client: TestClient, sample: OrgSample) -> int:
+    root: int = created(client, "/departments/", {"name": "doomed", "parent_id": sample.root})
+    for index in range(BULK_SIZE // 10):
+        child: int = created(client, "/departments/", {"name": f"doomed-{index}", "parent_id": root})
+        client.post(f"/departments/{child}/roles/", json={"name": "doomed", "permissions": ["permission-0"]})
+        client.post("/employees/", json={"name": "doomed", "surname": str(index), "department_id": child})
+    return root
+
+
+def roles_url(sample: OrgSample) -> str:
+    return f"/departments/{sample.department}/roles/"
+
+
+def employee_ids(sample: OrgSample) -> dict[str, Any]:
+    return {"json": {"employee_ids": list(range(sample.employee, sample.employee + BULK_SIZE))}}
+
+
+CASES: tuple[Case, ...] = (
+    Case("GET", "/departments/", lambda client, sample, i: ("/departments/", {})),
+    Case(
+        "GET",
+        "/departments/",
+        lambda client, sample, i: ("/departments/", {"params": {"limit": MAX_PAGE_SIZE}}),
+        variant=f"?limit={MAX_PAGE_SIZE}",
+    ),
+    Case(
+        "GET",
+        "/departments/",
+        lambda client, sample, i: ("/departments/", {"params": {"parent_id": sample.root, "sort": "name"}}),
+        variant="?parent_id&sort=name",
+    ),
+    Case(
+        "POST",
+        "/departments/",
+        lambda client, sample, i: ("/departments/", {"json": {"name": f"bench-{i}", "parent_id": sample.root}}),
+    ),
+    Case("GET", "/departments/{department_id}/", lambda client, sample, i: (f"/departments/{sample.root}/", {})),
+    Case(
+        "PATCH",
+        "/departments/{department_id}/",
+        lambda client, sample, i: (
+            f"/departments/{created(client, '/departments/', {'name': 'patch', 'parent_id': sample.root})}/",
+            {"json": {"name": f"renamed-{i}", "parent_id": sample.root}},
+        ),
+    ),
+    Case(
+        "DELETE",
+        "/departments/{department_id}/",
+        lambda client, sample, i: (
+            f"/departments/{created(client, '/departments/', {'name': 'delete', 'parent_id': sample.root})}/",
+            {},
+        ),
+    ),
+    Case(
+        "POST",
+        "/departments/{department_id}/employees/move/",
+        lambda client, sample, i: (
+            f"/departments/{(sample.root, sample.department)[i % 2]}/employees/move/",
+            employee_ids(sample),
+        ),
+    ),
+    Case(
+        "GET",
+        "/departments/{department_id}/subtree/",
+        lambda client, sample, i: (f"/departments/{sample.root}/subtree/", {}),
+        iterations=5,
+    ),
+    Case(
+        "POST",
+        "/departments/{department_id}/subtree/move/",
+        lambda client, sample, i: (
+            f"/departments/{created(client, '/departments/', {'name': f'moved-{i}'})}/subtree/move/",
+            {"json": {"parent_id": sample.department}},
+        ),
+    ),
+    Case(
+        "POST",
+        "/departments/{department_id}/subtree/archive/",
+        lambda client, sample, i: (
+            f"/departments/{sample.department}/subtree/archive/", {"json": {"archived": i % 2 == 0}}
+        ),
+    ),
+    Case(
+        "DELETE",
+        "/departments/{department_id}/subtree/",
+        lambda client, sample, i: (f"/departments/{subtree(client, sample)}/subtree/", {}),
+    ),
+    Case(
+        "GET",
+        "/departments/{department_id}/ancestors/",
+        lambda client, sample, i: (f"/departments/{sample.department}/ancestors/", {}),
+    ),
+    Case(
+        "GET",
+        "/departments/{department_id}/path/{other_id}/",
+        lambda client, sample, i: (f"/departments/{sample.department}/path/{sample.root}/", {}),
+    ),
+    Case("GET", "/employees/", lambda client, sample, i: ("/employees/", {})),
+    Case(
+        "GET",
+        "/employees/",
+        lambda client, sample, i: ("/employees/", {"params": {"limit": MAX_PAGE_SIZE}}),
+        variant=f"?limit={MAX_PAGE_SIZE}",
+    ),
+    Case(
+        "GET",
+        "/employees/",
+        lambda client, sample, i: (
+            "/employees/", {"params": {"name": "name-1", "sort": "-surname", "role_id": sample.role}}
+        ),
+        variant="?name&role_id&sort=-surname",
+    ),
+    Case(
+        "POST",
+        "/employees/",
+        lambda client, sample, i: (
+            "/employees/",
+            {"json": {"name": "bench", "surname": f"{i}", "department_id": sample.department,
+                      "roles": [{"name": "role-0"}, {"name": "role-1"}]}},
+        ),
+    ),
+    Case("GET", "/employees/{employee_id}/", lambda client, sample, i: (f"/employees/{sample.employee}/", {})),
+    Case(
+        "PATCH",
+        "/employees/{employee_id}/",
+        lambda client, sample, i: (
+            f"/employees/{created(client, '/employees/', {'name': 'patch', 'surname': 'me', 'department_id': None})}/",
+            {"json": {"name": "patched", "surname": f"{i}", "department_id": sample.department,
+                      "roles": [{"name": "role-0"}]}},
+        ),
+    ),
+    Case(
+        "DELETE",
+        "/employees/{employee_id}/",
+        lambda client, sample, i: (
+            f"/employees/{created(client, '/employees/', {'name': 'del', 'surname': 'me', 'department_id': None})}/",
+            {},
+        ),
+    ),
+    Case(
+        "GET",
+        "/employees/{employee_id}/permissions/",
+        lambda client, sample, i: (f"/employees/{sample.employee}/permissions/", {}),
+    ),
+    Case(
+        "POST",
+        "/employees/{employee_id}/permissions/check/",
+        lambda client, sample, i: (
+            f"/employees/{sample.employee}/permissions/check/",
+            {"json": {"permissions": ["permission-0", "permission-1"]}},
+        ),
+    ),
+    Case("GET", "/departments/{department_id}/roles/", lambda client, sample, i: (roles_url(sample), {})),
+    Case(
+        "POST",
+        "/departments/{department_id}/roles/",
+        lambda client, sample, i: (
+            roles_url(sample),
+            {"json": {"name": f"bench-{i}", "permissions": ["permission-0", "permission-1"]}},
+        ),
+    ),
+    Case(
+        "GET",
+        "/departments/{department_id}/roles/{role_id}/",
+        lambda client, sample, i: (f"{roles_url(sample)}{sample.role}/", {}),
+    ),
+    Case(
+        "PATCH",
+        "/departments/{department_id}/roles/{role_id}/",
+        lambda client, sample, i: (
+            f"{roles_url(sample)}{created(client, roles_url(sample), {'name': f'patch-{i}'})}/",
+            {"json": {"name": f"patched-{i}", "permissions": ["permission-2"]}},
+        ),
+    ),
+    Case(
+        "DELETE",
+        "/departments/{department_id}/roles/{role_id}/",
+        lambda client, sample, i: (f"{roles_url(sample)}{created(client, roles_url(sample), {'name': 'delete'})}/", {}),
+    ),
+    Case(
+        "POST",
+        "/departments/{department_id}/roles/{role_id}/employees/assign/",
+        lambda client, sample, i: (f"{roles_url(sample)}{sample.role}/employees/assign/", employee_ids(sample)),
+    ),
+    Case(
+        "POST",
+        "/departments/{department_id}/roles/{role_id}/employees/revoke/",
+        lambda client, sample, i: (f"{roles_url(sample)}{sample.role}/employees/revoke/", employee_ids(sample)),
+    ),
+    Case("GET", "/permissions/", lambda client, sample, i: ("/permissions/", {})),
+    Case("POST", "/permissions/", lambda client, sample, i: ("/permissions/", {"json": {"name": f"bench-{i}"}})),
+    Case(
+        "POST",
+        "/permissions/check/batch/",
+        lambda client, sample, i: (
+            "/permissions/check/batch/",
+            {
+                "json": {
+                    "checks": [
+                        (sample.employee + index % BULK_SIZE, f"permission-{index % 10}")
+                        for index in range(BULK_SIZE * 10)
+                    ]
+                }
+            },
+        ),
+    ),
+    Case(
+        "DELETE",
+        "/permissions/{permission_id}/",
+        lambda client, sample, i: (f"/permissions/{created(client, '/permissions/', {'name': 'delete'})}/", {}),
+    ),
+    Case(
+        "POST",
+        "/import/",
+        lambda client, sample, i: (
+            "/import/",
+            {"content": b'{"type": "department", "key": "d", "name": "imported"}\n'
+                        b'{"type": "employee", "key": "e", "name": "a", "surname": "b", "department": "d"}\n'},
+        ),
+    ),
+    Case(
+        "POST",
+        "/batch/",
+        lambda client, sample, i: (
+            "/batch/",
+            {"json": {"operations": [
+                {"method": "POST", "path": "/departments/", "ref": "department",
+                 "body": {"name": f"batch-{i}", "parent_id": sample.root}},
+                {"method": "POST", "path": "/departments/$ref:department/roles/", "body": {
+                    "name": "lead", "permissions": ["permission-0", "permission-1"]}},
+                *({"method": "POST", "path": "/employees/", "body": {
+                    "name": "batch", "surname": f"{index}", "department_id": "$ref:department",
+                    "roles": [{"name": "lead"}]}} for index in range(10)),
+            ]}},
+        ),
+    ),
+    Case("GET", "/search/", lambda client, sample, i: ("/search/", {"params": {"q": f"{i + 1}23", "limit": 20}})),
+    Case(
+        "GET",
+        "/changes/",
+        lambda client, sample, i: ("/changes/", {"params": {"since": i * BULK_SIZE, "limit": BULK_SIZE}}),
+    ),
+    Case(
+        "GET",
+        "/changes/",
+        lambda client, sample, i: ("/changes/", {"params": {"since": i * MAX_PAGE_SIZE, "limit": MAX_PAGE_SIZE}}),
+        variant="limit=1000",
+    ),
+    Case("POST", "/changes/compact/", lambda client, sample, i: ("/changes/compact/", {"json": {}}), iterations=3),
+    Case("GET", "/export/", lambda client, sample, i: ("/export/", {}), iterations=3),
+    Case("GET", "/debug/cache/", lambda client, sample, i: ("/debug/cache/", {})),
+    Case("GET", "/debug/slow-queries/", lambda client, sample, i: ("/debug/slow-queries/", {})),
+    Case("GET", "/metrics", lambda client, sample, i: ("/metrics", {})),
+)
+
+
+def fresh_database(path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    for suffix in ("", "-wal", "-shm", "-journal"):
+        Path(f"{path}{suffix}").unlink(missing_ok=True)
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    ordered: list[float] = sorted(values)
+    return ordered[round(fraction * (len(ordered) - 1))]
+
+
+def measure(client: TestClient, sample: OrgSample, case: Case, iterations: int, statements: list[str]) -> dict:
+    timings: list[float] = []
+    queries: list[int] = []
+    statuses: set[int] = set()
+    for iteration in range(min(iterations, case.iterations or iterations)):
+        url, kwargs = case.request(client, sample, iteration)
+        statements.clear()
+        started: int = perf_counter_ns()
+        response = client.request(case.method, url, **kwargs)
+        timings.append((perf_counter_ns() - started) / 1e6)
+        queries.append(len(statements))
+        statuses.add(response.status_code)
+    return {
+        "method": case.method,
+        "route": case.route,
+        "variant": case.variant,
+        "iterations": len(timings),
+        "statuses": sorted(statuses),
+        "min_ms": round(min(timings), 3),
+        "median_ms": round(percentile(timings, 0.5), 3),
+        "p95_ms": round(percentile(timings, 0.95), 3),
+        "max_ms": round(max(timings), 3),
+        "queries": round(sum(queries) / len(queries), 2),
+        "max_queries": max(queries),
+    }
+
+
+def uncovered_routes(app: FastAPI) -> list[str]:
+    covered: set[tuple[str, str]] = {(case.method, case.route) for case in CASES}
+    return sorted(
+        f"{method} {route.path}"
+        for route in app.routes if isinstance(route, APIRoute)
+        for method in route.methods
+        if (method, route.path) not in covered
+    )
+
+
+def run_benchmark(shape: OrgShape, database: Path, iterations: int = 20, mode: str = "sync") -> dict[str, Any]:
+    fresh_database(database)
+    write_engine: Engine = configure(
+        create_engine(f"sqlite:///{database}", connect_args={"check_same_thread": False}),
+        apply_write_pragmas,
+    )
+    read_engine: Engine = configure(
+        create_engine(f"sqlite:///file:{database}?mode=ro&uri=true", connect_args={"check_same_thread": False}),
+        apply_read_pragmas,
+    )
+    async_engine: AsyncEngine = create_async_engine(f"sqlite+aiosqlite:///{database}", poolclass=NullPool)
+    configure(async_engine.sync_engine, apply_write_pragmas)
+    Base.metadata.create_all(bind=write_engine)
+    migrate(write_engine)
+    identity_cache.clear()
+    permission_cache.clear()
+
+    session_factory = sessionmaker(autoflush=False, bind=write_engine)
+    read_session_factory = sessionmaker(autoflush=False, bind=read_engine)
+    async_session_factory = async_sessionmaker(autoflush=False, expire_on_commit=False, bind=async_engine)
+
+    started: float = perf_counter()
+    with session_factory() as db:
+        sample: OrgSample = load_org(db, shape)
+        rows: dict[str, int] = {
+            table.name: db.execute(select(func.count()).select_from(table)).scalar()
+            for table in Base.metadata.sorted_tables
+        }
+    generate_seconds: float = perf_counter() - started
+
+    def override_get_db():
+        with session_factory() as db:
+            yield db
+
+    def override_get_read_db():
+        with read_session_factory() as db:
+            yield db
+
+    async def override_get_async_db():
+        async with async_session_factory() as db:
+            yield db
+
+    app: FastAPI = create_app(mode, debug=True)
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_read_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+
+    statements: list[str] = []
+
+    def count(conn, cursor, statement, parameters, context, executemany) -> None:
+        statements.append(statement)
+
+    engines: tuple[Engine, ...] = (write_engine, read_engine, async_engine.sync_engine)
+    for counted in engines:
+        event.listen(counted, "before_cursor_execute", count)
+    try:
+        with TestClient(app) as client:
+            results: list[dict] = [measure(client, sample, case, iterations, statements) for case in CASES]
+    finally:
+        for counted in engines:
+            event.remove(counted, "before_cursor_execute", count)
+        write_engine.dispose()
+        read_engine.dispose()
+
+    return {
+        "shape": asdict(shape),
+        "mode": mode,
+        "iterations": iterations,
+        "environment": {
+            "python": python_version(),
+            "sqlite": sqlite_version,
+            "sqlalchemy": sqlalchemy.__version__,
+            "fastapi": fastapi.__version__,
+        },
+        "rows": rows,
+        "generate_seconds": round(generate_seconds, 3),
+        "results": results,
+        "uncovered": uncovered_routes(app),
+    }
+
+
+def compare(previous: dict[str, Any], current: dict[str, Any]) -> list[str]:
+    baseline: dict[tuple[str, str, str], dict] = {
+        (row["method"], row["route"], row.get("variant", "")): row for row in previous["results"]
+    }
+    lines: list[str] = []
+    for row in current["results"]:
+        before: dict | None = baseline.get((row["method"], row["route"], row["variant"]))
+        if before is None or not before["median_ms"]:
+            continue
+        lines.append(
+            f"{row['method']:6} {row['route'] + row['variant']:50} "
+            f"{before['median_ms']:>10.3f} -> {row['median_ms']:>10.3f} ms "
+            f"({row['median_ms'] / before['median_ms']:.2f}x), queries {before['queries']} -> {row['queries']}"
+        )
+    return lines
+
+
+def parse_args() -> Namespace:
+    parser: ArgumentParser = ArgumentParser(description="Benchmark every API route against a synthetic org")
+    defaults: OrgShape = OrgShape()
+    parser.add_argument("--employees", type=int, default=defaults.employees)
+    parser.add_argument("--depth", type=int, default=defaults.depth)
+    parser.add_argument("--fan-out", type=int, default=defaults.fan_out)
+    parser.add_argument("--roles-per-department", type=int, default=defaults.roles_per_department)
+    parser.add_argument("--roles-per-employee", type=int, default=defaults.roles_per_employee)
+    parser.add_argument("--permissions", type=int, default=defaults.permissions)
+    parser.add_argument("--permissions-per-role", type=int, default=defaults.permissions_per_role)
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--mode", choices=("sync", "async"), default="sync")
+    parser.add_argument("--database", type=Path, default=Path("./instance/benchmark.db"))
+    parser.add_argument("--output", type=Path, default=Path("./instance/benchmark.json"))
+    parser.add_argument("--compare", type=Path, default=None)
+    args: Namespace = parser.parse_args()
+    if min(args.employees, args.depth, args.fan_out, args.roles_per_department, args.permissions) < 1:
+        parser.error("employees, depth, fan-out, roles-per-department and permissions must be positive")
+    return args
+
+
+if __name__ == "__main__":
+    arguments: Namespace = parse_args()
+    org_shape: OrgShape = OrgShape(
+        employees=arguments.employees,
+        depth=arguments.depth,
+        fan_out=arguments.fan_out,
+        roles_per_department=arguments.roles_per_department,
+        roles_per_employee=arguments.roles_per_employee,
+        permissions=arguments.permissions,
+        permissions_per_role=arguments.permissions_per_role,
+        seed=arguments.seed,
+    )
+    report: dict[str, Any] = run_benchmark(org_shape, arguments.database, arguments.iterations, arguments.mode)
+    with open(arguments.output, "w") as output:
+        dump(report, output, indent=2)
+    for result in report["results"]:
+        label: str = result["route"] + result["variant"]
+        print(f"{result['method']:6} {label:50} {result['median_ms']:>10.3f} ms {result['queries']:>8} q")
+    for route in report["uncovered"]:
+        print(f"Not benchmarked: {route}")
+    if arguments.compare is not None:
+        with open(arguments.compare) as previous_file:
+            print("\n".join(compare(load(previous_file), report)))
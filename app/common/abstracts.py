@@ -1,25 +1,199 @@
-from re import sub
-from typing import Self
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from json import dumps, loads
+from typing import Any, Callable, Iterable, Self
 
-from sqlalchemy.orm import Session
+from fastapi import HTTPException, Query as QueryParam, Response
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import ColumnElement, Insert, Row, Select, event, func, select, tuple_
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, Query
+from sqlalchemy.orm.interfaces import LoaderOption
 
+from common.cache import MISSING, forget_instance, identity_cache
 from common.database import Base
+from common.filters import DEFAULT_SORT, Sort
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+MAX_BULK_SIZE = 50000
+
+NAME_TRANSLATION: dict[int, str] = str.maketrans(" _,./\\+=", "-" * 8)
+
+
+class Pagination:
+    def __init__(
+            self,
+            response: Response,
+            limit: int = QueryParam(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+            after: str | None = QueryParam(None, max_length=512),
+    ) -> None:
+        self.response: Response = response
+        self.limit: int = limit
+        self.after: str | None = after
+
+    def position(self, sort: Sort) -> tuple | None:
+        if self.after is None:
+            return None
+        try:
+            if sort.attribute == "id":
+                return int(self.after),
+            value, entry_id = loads(urlsafe_b64decode(self.after.encode()))
+            return value, int(entry_id)
+        except (ValueError, TypeError):
+            raise HTTPException(status_code=422, detail="Invalid cursor")
+
+    def trim(self, rows: list, sort: Sort = DEFAULT_SORT) -> list:
+        if len(rows) <= self.limit:
+            return rows
+        rows = rows[:self.limit]
+        last: Any = rows[-1]
+        self.response.headers["X-Next-Cursor"] = (
+            str(last.id)
+            if sort.attribute == "id"
+            else urlsafe_b64encode(dumps([getattr(last, sort.attribute), last.id]).encode()).decode()
+        )
+        return rows
+
+    def render(self, rows: Iterable[Any], schema: type) -> Response:
+        fields: tuple[str, ...] = tuple(schema.model_fields)
+        return ORJSONResponse(
+            [{field: getattr(row, field) for field in fields} for row in rows],
+            headers=self.response.headers,
+        )
 
 
 class BaseModel(Base):
     __abstract__ = True
 
     @classmethod
-    def get_list(cls, db: Session, **kwargs) -> list[Self]:
-        return db.query(cls).filter_by(**kwargs).all()
+    def get_list(cls, db: Session, schema: type | None = None, **kwargs) -> list[Self]:
+        return db.query(cls).options(*cls.loader_options(schema)).filter_by(**kwargs).all()
+
+    @classmethod
+    def loader_options(cls, schema: type | None) -> list[LoaderOption]:
+        loaders: dict[str, Callable[[Any], LoaderOption]] = getattr(schema, "loaders", {})
+        return [loader(getattr(cls, name)) for name, loader in loaders.items()]
+
+    @classmethod
+    def sort_columns(cls, sort: Sort) -> list[ColumnElement]:
+        return [cls.id] if sort.attribute == "id" else [sort.column(cls), cls.id]
+
+    @classmethod
+    def page_criteria(cls, page: Pagination, sort: Sort) -> list[ColumnElement]:
+        position: tuple | None = page.position(sort)
+        if position is None:
+            return []
+        columns: list[ColumnElement] = cls.sort_columns(sort)
+        if len(columns) == 1:
+            return [columns[0] < position[0] if sort.descending else columns[0] > position[0]]
+        key: ColumnElement = tuple_(*columns)
+        if sort.descending:
+            return [columns[0] <= position[0], key < tuple_(*position)]
+        return [columns[0] >= position[0], key > tuple_(*position)]
+
+    @classmethod
+    def page_order(cls, sort: Sort) -> list[ColumnElement]:
+        return [column.desc() if sort.descending else column for column in cls.sort_columns(sort)]
+
+    @classmethod
+    def get_page(
+            cls,
+            db: Session,
+            page: Pagination,
+            schema: type | None = None,
+            criteria: Iterable[ColumnElement] = (),
+            sort: Sort = DEFAULT_SORT,
+            **kwargs,
+    ) -> list[Self]:
+        query: Query = (
+            db.query(cls)
+            .options(*cls.loader_options(schema))
+            .filter_by(**kwargs)
+            .filter(*criteria, *cls.page_criteria(page, sort))
+        )
+        return page.trim(query.order_by(*cls.page_order(sort)).limit(page.limit + 1).all(), sort)
+
+    @classmethod
+    def projection(cls, schema: type, *extra: str) -> list[ColumnElement]:
+        return [cls.__table__.c[name] for name in dict.fromkeys((*schema.model_fields, *extra))]
+
+    @classmethod
+    def select_page(
+            cls,
+            stmt: Select,
+            page: Pagination,
+            criteria: Iterable[ColumnElement] = (),
+            sort: Sort = DEFAULT_SORT,
+    ) -> Select:
+        return (
+            stmt.where(*criteria, *cls.page_criteria(page, sort))
+            .order_by(*cls.page_order(sort))
+            .limit(page.limit + 1)
+        )
+
+    @classmethod
+    def select_rows(
+            cls,
+            page: Pagination,
+            schema: type,
+            criteria: Iterable[ColumnElement] = (),
+            sort: Sort = DEFAULT_SORT,
+            **kwargs,
+    ) -> Select:
+        return cls.select_page(
+            select(*cls.projection(schema, "id", sort.attribute)).filter_by(**kwargs), page, criteria, sort
+        )
+
+    @classmethod
+    def get_rows(
+            cls,
+            db: Session,
+            page: Pagination,
+            schema: type,
+            criteria: Iterable[ColumnElement] = (),
+            sort: Sort = DEFAULT_SORT,
+            **kwargs,
+    ) -> list[Row]:
+        return page.trim(db.execute(cls.select_rows(page, schema, criteria, sort, **kwargs)).all(), sort)
 
     @classmethod
     def get_first(cls, db: Session, **kwargs) -> Self:
         return db.query(cls).filter_by(**kwargs).first()
 
+    @staticmethod
+    def normalize_name(name: str) -> str:
+        return name.strip().lower().translate(NAME_TRANSLATION)
+
+    @classmethod
+    def select_names(cls, names: Iterable[str], **kwargs) -> Select:
+        return select(cls.name, cls.id).filter_by(**kwargs).where(cls.name.in_(names))
+
+    @classmethod
+    def insert_names(cls, names: Iterable[str], **kwargs) -> Insert:
+        return (
+            insert(cls)
+            .values([{"name": name, **kwargs} for name in names])
+            .on_conflict_do_nothing()
+            .returning(cls.name, cls.id)
+        )
+
+    @classmethod
+    def get_or_create_many(cls, db: Session, names: Iterable[str], **kwargs) -> dict[str, int]:
+        wanted: list[str] = list(dict.fromkeys(cls.normalize_name(name) for name in names))
+        if not wanted:
+            return {}
+        found: dict[str, int] = dict(db.execute(cls.select_names(wanted, **kwargs)).all())
+        if missing := [name for name in wanted if name not in found]:
+            found.update(db.execute(cls.insert_names(missing, **kwargs)).all())
+            db.commit()
+        if missing := [name for name in wanted if name not in found]:
+            found.update(db.execute(cls.select_names(missing, **kwargs)).all())
+        return {name: found[name] for name in wanted}
+
     @classmethod
     def get_or_create(cls, db: Session, **kwargs) -> Self:
-        name: str = sub(" _,./\\+=", "-", kwargs.pop("name").lower())
+        name: str = cls.normalize_name(kwargs.pop("name"))
         row: Self = cls.get_first(db, name=name, **kwargs)
         if row is None:
             row: Self = cls(name=name, **kwargs)
@@ -28,13 +202,140 @@ class BaseModel(Base):
         return row
 
     @classmethod
-    def find_by_id(cls, db: Session, entry_id: int) -> Self | None:
-        return db.query(cls).filter_by(id=entry_id).first()
+    def find_by_id(cls, db: Session, entry_id: int, schema: type | None = None) -> Self | None:
+        return db.query(cls).options(*cls.loader_options(schema)).filter_by(id=entry_id).first()
 
     @classmethod
     def find_by_name(cls, db: Session, entry_name: str) -> Self | None:
         return db.query(cls).filter_by(name=entry_name).first()
 
+    @staticmethod
+    def id_list(ids: Iterable[int]) -> Select:
+        return select(func.json_each(dumps(list(ids))).table_valued("value").c.value)
+
+    @classmethod
+    def missing_ids(cls, db: Session, ids: Iterable[int]) -> list[int]:
+        wanted: list[int] = list(dict.fromkeys(ids))
+        found: set[int] = set(db.scalars(select(cls.id).where(cls.id.in_(cls.id_list(wanted)))))
+        return [entry_id for entry_id in wanted if entry_id not in found]
+
+    @classmethod
+    def select_snapshot(cls, **kwargs) -> Select:
+        return select(*cls.__table__.columns).filter_by(**kwargs)
+
+    @classmethod
+    def get_snapshot(cls, db: Session, **kwargs) -> Row | None:
+        if not identity_cache.enabled:
+            return db.execute(cls.select_snapshot(**kwargs)).first()
+        (field, value), = kwargs.items()
+        snapshot: Row | None = identity_cache.get(cls.__tablename__, field, value)
+        if snapshot is MISSING:
+            generation: int = identity_cache.generation
+            snapshot = db.execute(cls.select_snapshot(**kwargs)).first()
+            identity_cache.put(cls.__tablename__, field, value, snapshot, generation)
+        return snapshot
+
+    @classmethod
+    def exists(cls, db: Session, entry_id: int) -> bool:
+        return cls.get_snapshot(db, id=entry_id) is not None
+
     def delete(self, db: Session) -> None:
         db.delete(self)
         db.commit()
+
+    @classmethod
+    def select_with(cls, schema: type | None = None, **kwargs) -> Select:
+        return (
+            select(cls)
+            .options(*cls.loader_options(schema))
+            .filter_by(**kwargs)
+            .execution_options(populate_existing=True)
+        )
+
+    @classmethod
+    async def aget_list(cls, db: AsyncSession, schema: type | None = None, **kwargs) -> list[Self]:
+        return list((await db.scalars(cls.select_with(schema, **kwargs))).unique())
+
+    @classmethod
+    async def aget_page(
+            cls,
+            db: AsyncSession,
+            page: Pagination,
+            schema: type | None = None,
+            criteria: Iterable[ColumnElement] = (),
+            sort: Sort = DEFAULT_SORT,
+            **kwargs,
+    ) -> list[Self]:
+        stmt: Select = cls.select_page(cls.select_with(schema, **kwargs), page, criteria, sort)
+        return page.trim(list((await db.scalars(stmt)).unique()), sort)
+
+    @classmethod
+    async def aget_rows(
+            cls,
+            db: AsyncSession,
+            page: Pagination,
+            schema: type,
+            criteria: Iterable[ColumnElement] = (),
+            sort: Sort = DEFAULT_SORT,
+            **kwargs,
+    ) -> list[Row]:
+        return page.trim((await db.execute(cls.select_rows(page, schema, criteria, sort, **kwargs))).all(), sort)
+
+    @classmethod
+    async def aget_first(cls, db: AsyncSession, **kwargs) -> Self | None:
+        return (await db.scalars(cls.select_with(**kwargs).limit(1))).first()
+
+    @classmethod
+    async def aget_or_create(cls, db: AsyncSession, **kwargs) -> Self:
+        name: str = cls.normalize_name(kwargs.pop("name"))
+        row: Self | None = await cls.aget_first(db, name=name, **kwargs)
+        if row is None:
+            row = cls(name=name, **kwargs)
+            db.add(row)
+            await db.commit()
+        return row
+
+    @classmethod
+    async def aget_or_create_many(cls, db: AsyncSession, names: Iterable[str], **kwargs) -> dict[str, int]:
+        wanted: list[str] = list(dict.fromkeys(cls.normalize_name(name) for name in names))
+        if not wanted:
+            return {}
+        found: dict[str, int] = dict((await db.execute(cls.select_names(wanted, **kwargs))).all())
+        if missing := [name for name in wanted if name not in found]:
+            found.update((await db.execute(cls.insert_names(missing, **kwargs))).all())
+            await db.commit()
+        if missing := [name for name in wanted if name not in found]:
+            found.update((await db.execute(cls.select_names(missing, **kwargs))).all())
+        return {name: found[name] for name in wanted}
+
+    @classmethod
+    async def afind_by_id(cls, db: AsyncSession, entry_id: int, schema: type | None = None) -> Self | None:
+        return (await db.scalars(cls.select_with(schema, id=entry_id))).unique().first()
+
+    @classmethod
+    async def afind_by_name(cls, db: AsyncSession, entry_name: str) -> Self | None:
+        return await cls.aget_first(db, name=entry_name)
+
+    @classmethod
+    async def aget_snapshot(cls, db: AsyncSession, **kwargs) -> Row | None:
+        if not identity_cache.enabled:
+            return (await db.execute(cls.select_snapshot(**kwargs))).first()
+        (field, value), = kwargs.items()
+        snapshot: Row | None = identity_cache.get(cls.__tablename__, field, value)
+        if snapshot is MISSING:
+            generation: int = identity_cache.generation
+            snapshot = (await db.execute(cls.select_snapshot(**kwargs))).first()
+            identity_cache.put(cls.__tablename__, field, value, snapshot, generation)
+        return snapshot
+
+    @classmethod
+    async def aexists(cls, db: AsyncSession, entry_id: int) -> bool:
+        return await cls.aget_snapshot(db, id=entry_id) is not None
+
+    async def adelete(self, db: AsyncSession) -> None:
+        await db.delete(self)
+        await db.commit()
+
+
+for mapper_event in ("after_insert", "after_update", "after_delete"):
+    event.listen(BaseModel, mapper_event, forget_instance, propagate=True)
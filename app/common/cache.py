@@ -0,0 +1,137 @@
+from collections import OrderedDict
+from threading import Lock
+from time import monotonic
+from typing import Any, Hashable
+
+from sqlalchemy import event, inspect
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Mapper, Session, SessionTransaction, ORMExecuteState
+
+from common.settings import settings
+from common.versions import table_versions
+
+MISSING = object()
+
+
+class IdentityCache:
+    def __init__(self, max_size: int, ttl: float) -> None:
+        self.max_size: int = max_size
+        self.ttl: float = ttl
+        self._lock: Lock = Lock()
+        self._generation: int = 0
+        self._entries: OrderedDict[tuple[str, str, Hashable], tuple[float, Any]] = OrderedDict()
+        self._tables: set[str] = set()
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def get(self, table: str, field: str, value: Hashable) -> Any:
+        key: tuple[str, str, Hashable] = (table, field, value)
+        with self._lock:
+            entry: tuple[float, Any] | None = self._entries.get(key)
+            if entry is not None and entry[0] < monotonic():
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return MISSING
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, table: str, field: str, value: Hashable, snapshot: Any, generation: int) -> None:
+        key: tuple[str, str, Hashable] = (table, field, value)
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._tables.add(table)
+            self._entries[key] = (monotonic() + self.ttl, snapshot)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, table: str, fields: list[tuple[str, Hashable]]) -> None:
+        with self._lock:
+            self._generation += 1
+            for field, value in fields:
+                self._entries.pop((table, field, value), None)
+
+    def invalidate_table(self, table: str) -> None:
+        with self._lock:
+            self._generation += 1
+            if table not in self._tables:
+                return
+            for key in [key for key in self._entries if key[0] == table]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._tables.clear()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+identity_cache = IdentityCache(settings.identity_cache_size, settings.identity_cache_ttl)
+
+
+def cached_keys(target: Any) -> list[tuple[str, Hashable]]:
+    keys: list[tuple[str, Hashable]] = [("id", target.id)]
+    if "name" in target.__table__.columns:
+        keys.append(("name", target.name))
+        keys.extend(("name", name) for name in inspect(target).attrs.name.history.deleted)
+    return keys
+
+
+def forget_instance(mapper: Mapper, connection: Connection, target: Any) -> None:
+    keys: list[tuple[str, Hashable]] = cached_keys(target)
+    identity_cache.invalidate(target.__tablename__, keys)
+    session: Session | None = Session.object_session(target)
+    if session is not None:
+        session.info.setdefault("forget_identities", []).append((target.__tablename__, keys))
+
+
+@event.listens_for(Session, "do_orm_execute")
+def forget_statement(orm_execute_state: ORMExecuteState) -> None:
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        identity_cache.invalidate_table(orm_execute_state.statement.table.name)
+
+
+def forget_pending(session: Session) -> None:
+    for table, keys in session.info.pop("forget_identities", []):
+        identity_cache.invalidate(table, keys)
+
+
+@event.listens_for(Session, "after_commit")
+def forget_committed(session: Session) -> None:
+    forget_pending(session)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def forget_rolled_back(session: Session, previous_transaction: SessionTransaction) -> None:
+    forget_pending(session)
+
+
+def forget_tables(tables: set[str]) -> None:
+    for table in tables:
+        identity_cache.invalidate_table(table)
+
+
+table_versions.subscribe(forget_tables)
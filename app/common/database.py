@@ -1,20 +1,96 @@
-from sqlalchemy import create_engine
+from typing import Callable
+
+from sqlalchemy import create_engine, event, Engine
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+
+from common.settings import settings
+
+SQLALCHEMY_DATABASE_URL = f"sqlite:///{settings.database_path}"
+READ_SQLALCHEMY_DATABASE_URL = f"sqlite:///file:{settings.database_path}?mode=ro&uri=true"
+ASYNC_SQLALCHEMY_DATABASE_URL = f"sqlite+aiosqlite:///{settings.database_path}"
+
+DATABASE_MODE = settings.database_mode
+
+
+def apply_read_pragmas(dbapi_connection, connection_record) -> None:
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA busy_timeout={settings.busy_timeout}")
+    cursor.execute(f"PRAGMA cache_size={settings.cache_size}")
+    cursor.execute(f"PRAGMA mmap_size={settings.mmap_size}")
+    cursor.execute(f"PRAGMA temp_store={settings.temp_store}")
+    cursor.close()
 
-SQLALCHEMY_DATABASE_URL = "sqlite:///./instance/app.db"
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
+def apply_write_pragmas(dbapi_connection, connection_record) -> None:
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA journal_mode={settings.journal_mode}")
+    cursor.execute(f"PRAGMA synchronous={settings.synchronous}")
+    cursor.close()
+    apply_read_pragmas(dbapi_connection, connection_record)
+
+
+def configure(new_engine: Engine, pragmas: Callable[..., None]) -> Engine:
+    event.listen(new_engine, "connect", pragmas)
+    return new_engine
+
+
+engine = configure(
+    create_engine(
+        SQLALCHEMY_DATABASE_URL,
+        connect_args={"check_same_thread": False},
+        pool_size=settings.write_pool_size,
+        max_overflow=0,
+        pool_timeout=settings.pool_timeout,
+    ),
+    apply_write_pragmas,
+)
+read_engine = configure(
+    create_engine(
+        READ_SQLALCHEMY_DATABASE_URL,
+        connect_args={"check_same_thread": False},
+        pool_size=settings.read_pool_size,
+        max_overflow=0,
+        pool_timeout=settings.pool_timeout,
+    ),
+    apply_read_pragmas,
 )
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+
+async_engine = create_async_engine(ASYNC_SQLALCHEMY_DATABASE_URL)
+configure(async_engine.sync_engine, apply_write_pragmas)
+AsyncSessionLocal = async_sessionmaker(autoflush=False, expire_on_commit=False, bind=async_engine)
 
 Base = declarative_base()
 
 
+class BatchSession(Session):
+    def commit(self) -> None:
+        self.flush()
+        self.expire_all()
+
+    def commit_batch(self) -> None:
+        super().commit()
+
+
 def get_db():
     session = SessionLocal()
     try:
         yield session
     finally:
         session.close()
+
+
+def get_read_db():
+    session = ReadSessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as session:
+        yield session
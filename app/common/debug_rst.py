@@ -0,0 +1,18 @@
+from typing import Any
+
+from fastapi import APIRouter, Query
+
+from common.cache import identity_cache
+from common.slow_queries import slow_query_log
+
+router = APIRouter(tags=["debug"], prefix="/debug")
+
+
+@router.get("/cache/")
+def get_cache_stats() -> dict[str, int]:
+    return identity_cache.stats()
+
+
+@router.get("/slow-queries/")
+def get_slow_queries(limit: int = Query(10, ge=1, le=100)) -> list[dict[str, Any]]:
+    return slow_query_log.top(limit)
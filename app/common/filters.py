@@ -0,0 +1,61 @@
+from dataclasses import dataclass
+from enum import Enum
+from string import ascii_lowercase, ascii_uppercase
+from typing import Any, Callable
+
+from fastapi import Query as QueryParam
+from sqlalchemy import ColumnElement, String
+from sqlalchemy.orm import InstrumentedAttribute
+
+
+@dataclass(frozen=True)
+class Sort:
+    attribute: str = "id"
+    descending: bool = False
+
+    def column(self, model: type) -> ColumnElement:
+        column: InstrumentedAttribute = getattr(model, self.attribute)
+        return column.collate("NOCASE") if isinstance(column.type, String) else column
+
+
+DEFAULT_SORT = Sort()
+
+ASCII_FOLD: dict[int, int] = str.maketrans(ascii_uppercase, ascii_lowercase)
+MAX_CODE_POINT = 0x10FFFF
+SURROGATES: range = range(0xD800, 0xE000)
+
+
+def sort_by(name: str, *attributes: str) -> Callable[..., Sort]:
+    keys: list[str] = ["id", *attributes]
+    SortKey: type[Enum] = Enum(
+        name,
+        [(key, key) for key in keys] + [(f"{key}_desc", f"-{key}") for key in keys],
+        type=str,
+    )
+
+    def sorting(sort: SortKey = QueryParam(SortKey.id)) -> Sort:
+        return Sort(sort.value.lstrip("-"), sort.value.startswith("-"))
+
+    return sorting
+
+
+def equal_or_in(column: InstrumentedAttribute, values: list[Any] | None) -> list[ColumnElement]:
+    if not values:
+        return []
+    return [column == values[0]] if len(values) == 1 else [column.in_(values)]
+
+
+def prefix_bound(value: str) -> str | None:
+    stem: str = value.translate(ASCII_FOLD).rstrip(chr(MAX_CODE_POINT))
+    if not stem:
+        return None
+    following: int = ord(stem[-1]) + 1
+    return stem[:-1] + chr(SURROGATES.stop if following in SURROGATES else following)
+
+
+def prefix(column: InstrumentedAttribute, value: str | None) -> list[ColumnElement]:
+    if not value:
+        return []
+    collated: ColumnElement = column.collate("NOCASE")
+    bound: str | None = prefix_bound(value)
+    return [collated >= value] if bound is None else [collated >= value, collated < bound]
@@ -0,0 +1,163 @@
+from bisect import bisect_left
+from contextvars import ContextVar
+from threading import Lock
+from time import perf_counter
+
+from anyio.to_thread import current_default_thread_limiter
+from sqlalchemy import Engine, event
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from common.slow_queries import slow_query_log
+
+LATENCY_BUCKETS: tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class RequestStats:
+    def __init__(self, scope: Scope) -> None:
+        self.scope: Scope = scope
+        self.started: float = perf_counter()
+        self.queries: int = 0
+        self.db_seconds: float = 0.0
+
+    def server_timing(self) -> str:
+        return (
+            f'db;desc="{self.queries} queries";dur={self.db_seconds * 1000:.3f}, '
+            f"app;dur={(perf_counter() - self.started) * 1000:.3f}"
+        )
+
+
+current_stats: ContextVar[RequestStats | None] = ContextVar("current_stats", default=None)
+
+
+class RouteMetrics:
+    def __init__(self) -> None:
+        self.buckets: list[int] = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.seconds: float = 0.0
+        self.count: int = 0
+        self.statuses: dict[int, int] = {}
+        self.queries: int = 0
+        self.db_seconds: float = 0.0
+        self.response_bytes: int = 0
+
+
+class RequestMetrics:
+    def __init__(self) -> None:
+        self._lock: Lock = Lock()
+        self._routes: dict[tuple[str, str], RouteMetrics] = {}
+
+    def observe(self, method: str, route: str, status: int, seconds: float, stats: RequestStats, size: int) -> None:
+        with self._lock:
+            metrics: RouteMetrics = self._routes.setdefault((method, route), RouteMetrics())
+            metrics.buckets[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+            metrics.seconds += seconds
+            metrics.count += 1
+            metrics.statuses[status] = metrics.statuses.get(status, 0) + 1
+            metrics.queries += stats.queries
+            metrics.db_seconds += stats.db_seconds
+            metrics.response_bytes += size
+
+    def clear(self) -> None:
+        with self._lock:
+            self._routes.clear()
+
+    def render(self) -> str:
+        lines: list[str] = [
+            "# TYPE http_request_duration_seconds histogram",
+        ]
+        with self._lock:
+            routes: list[tuple[tuple[str, str], RouteMetrics]] = sorted(self._routes.items())
+            for (method, route), metrics in routes:
+                labels: str = f'method="{method}",route="{route}"'
+                cumulative: int = 0
+                for bound, count in zip((*LATENCY_BUCKETS, "+Inf"), metrics.buckets):
+                    cumulative += count
+                    lines.append(f'http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f"http_request_duration_seconds_sum{{{labels}}} {metrics.seconds}")
+                lines.append(f"http_request_duration_seconds_count{{{labels}}} {metrics.count}")
+            for name, kind, value in (
+                ("http_requests_total", "counter", None),
+                ("http_request_db_queries_total", "counter", "queries"),
+                ("http_request_db_seconds_total", "counter", "db_seconds"),
+                ("http_response_size_bytes_total", "counter", "response_bytes"),
+            ):
+                lines.append(f"# TYPE {name} {kind}")
+                for (method, route), metrics in routes:
+                    labels = f'method="{method}",route="{route}"'
+                    if value is not None:
+                        lines.append(f"{name}{{{labels}}} {getattr(metrics, value)}")
+                        continue
+                    for status, count in sorted(metrics.statuses.items()):
+                        lines.append(f'{name}{{{labels},status="{status}"}} {count}')
+        limiter = current_default_thread_limiter()
+        lines.append("# TYPE threadpool_borrowed_tokens gauge")
+        lines.append(f"threadpool_borrowed_tokens {limiter.borrowed_tokens}")
+        lines.append("# TYPE threadpool_total_tokens gauge")
+        lines.append(f"threadpool_total_tokens {limiter.total_tokens}")
+        return "\n".join(lines) + "\n"
+
+
+request_metrics = RequestMetrics()
+
+
+def route_template(scope: Scope) -> str:
+    route = scope.get("route")
+    return route.path if route is not None else UNMATCHED_ROUTE
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def start_query(conn, cursor, statement, parameters, context, executemany) -> None:
+    conn.info.setdefault("query_started", []).append(perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def finish_query(conn, cursor, statement, parameters, context, executemany) -> None:
+    if not conn.info.get("query_started"):
+        return
+    seconds: float = perf_counter() - conn.info["query_started"].pop()
+    stats: RequestStats | None = current_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_seconds += seconds
+    slow_query_log.observe(
+        conn, statement, parameters, executemany, seconds, route_template(stats.scope) if stats is not None else None
+    )
+
+
+@event.listens_for(Engine, "handle_error")
+def abandon_query(exception_context) -> None:
+    if exception_context.connection is not None and exception_context.connection.info.get("query_started"):
+        exception_context.connection.info["query_started"].pop()
+
+
+class MetricsMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app: ASGIApp = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats: RequestStats = RequestStats(scope)
+        token = current_stats.set(stats)
+        status: int = 500
+        size: int = 0
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                MutableHeaders(scope=message).append("Server-Timing", stats.server_timing())
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_stats.reset(token)
+            request_metrics.observe(
+                scope["method"], route_template(scope), status, perf_counter() - stats.started, stats, size
+            )
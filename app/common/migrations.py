@@ -0,0 +1,134 @@
+from logging import getLogger, Logger
+from typing import Callable
+
+from sqlalchemy import Connection, Engine, inspect, text
+
+from common.abstracts import BaseModel
+from common.database import Base
+from common.versions import change_counters, create_epoch
+from departments.changes_db import Change, create_change_triggers
+from departments.search_db import create_search_index
+
+logger: Logger = getLogger(__name__)
+
+
+def add_lookup_indexes(connection: Connection) -> None:
+    for statement in (
+        "CREATE INDEX IF NOT EXISTS ix_departments_parent_id ON departments (parent_id)",
+        "CREATE INDEX IF NOT EXISTS ix_employees_department_id ON employees (department_id)",
+        "CREATE INDEX IF NOT EXISTS ix_roles_name ON roles (name)",
+        "CREATE INDEX IF NOT EXISTS ix_employee_roles_role_id ON employee_roles (role_id)",
+        "CREATE INDEX IF NOT EXISTS ix_role_permissions_permission_id ON role_permissions (permission_id)",
+    ):
+        connection.execute(text(statement))
+
+
+def merge_names(
+        connection: Connection,
+        table: str,
+        scope: tuple[str, ...],
+        references: tuple[tuple[str, str], ...],
+) -> None:
+    columns: str = ", ".join(("id", "name") + scope)
+    survivors: dict[tuple, int] = {}
+    renames: dict[int, str] = {}
+    rows: list = connection.execute(text(f"SELECT {columns} FROM {table} ORDER BY id")).all()
+    for row_id, name, *scope_values in rows:
+        normalized: str = BaseModel.normalize_name(name)
+        key: tuple = (*scope_values, normalized)
+        if key not in survivors:
+            survivors[key] = row_id
+            if normalized != name:
+                renames[row_id] = normalized
+            continue
+        for reference_table, column in references:
+            connection.execute(
+                text(f"UPDATE OR IGNORE {reference_table} SET {column} = :survivor WHERE {column} = :duplicate"),
+                {"survivor": survivors[key], "duplicate": row_id},
+            )
+            connection.execute(
+                text(f"DELETE FROM {reference_table} WHERE {column} = :duplicate"),
+                {"duplicate": row_id},
+            )
+        connection.execute(text(f"DELETE FROM {table} WHERE id = :duplicate"), {"duplicate": row_id})
+    for row_id, name in renames.items():
+        connection.execute(text(f"UPDATE {table} SET name = :name WHERE id = :id"), {"name": name, "id": row_id})
+
+
+def normalize_names(connection: Connection) -> None:
+    merge_names(connection, "permissions", (), (("role_permissions", "permission_id"),))
+    merge_names(
+        connection,
+        "roles",
+        ("department_id",),
+        (("role_permissions", "role_id"), ("employee_roles", "role_id")),
+    )
+    connection.execute(
+        text("CREATE UNIQUE INDEX IF NOT EXISTS ix_roles_department_id_name ON roles (department_id, name)")
+    )
+
+
+def add_sort_indexes(connection: Connection) -> None:
+    for statement in (
+        "CREATE INDEX IF NOT EXISTS ix_employees_name_nocase ON employees (name COLLATE NOCASE)",
+        "CREATE INDEX IF NOT EXISTS ix_employees_surname_nocase ON employees (surname COLLATE NOCASE)",
+        "CREATE INDEX IF NOT EXISTS ix_departments_name_nocase ON departments (name COLLATE NOCASE)",
+    ):
+        connection.execute(text(statement))
+
+
+def add_change_counters(connection: Connection) -> None:
+    change_counters.create(connection, checkfirst=True)
+    create_epoch(connection)
+
+
+def add_department_archive(connection: Connection) -> None:
+    columns: set[str] = {row[1] for row in connection.execute(text("PRAGMA table_info(departments)"))}
+    if "archived" not in columns:
+        connection.execute(text("ALTER TABLE departments ADD COLUMN archived BOOLEAN NOT NULL DEFAULT 0"))
+
+
+def add_change_log(connection: Connection) -> None:
+    Change.__table__.create(connection, checkfirst=True)
+    create_change_triggers(connection)
+
+
+MIGRATIONS: tuple[Callable[[Connection], None], ...] = (
+    add_lookup_indexes,
+    normalize_names,
+    create_search_index,
+    add_sort_indexes,
+    add_change_counters,
+    add_department_archive,
+    add_change_log,
+)
+
+
+def migrate(engine: Engine) -> int:
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        while True:
+            connection.exec_driver_sql("BEGIN IMMEDIATE")
+            try:
+                version: int = connection.exec_driver_sql("PRAGMA user_version").scalar()
+                if version >= len(MIGRATIONS):
+                    connection.exec_driver_sql("COMMIT")
+                    return version
+                logger.info("Applying migration %d: %s", version + 1, MIGRATIONS[version].__name__)
+                MIGRATIONS[version](connection)
+                connection.exec_driver_sql(f"PRAGMA user_version = {version + 1}")
+                connection.exec_driver_sql("COMMIT")
+            except Exception:
+                connection.exec_driver_sql("ROLLBACK")
+                raise
+
+
+def missing_indexes(engine: Engine) -> list[str]:
+    inspector = inspect(engine)
+    missing: list[str] = []
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            missing.extend(index.name for index in table.indexes)
+            continue
+        present: set[str] = {index["name"] for index in inspector.get_indexes(table.name)}
+        missing.extend(index.name for index in table.indexes if index.name not in present)
+    return missing
@@ -0,0 +1,33 @@
+from os import cpu_count, getenv
+
+
+class Settings:
+    database_path: str = getenv("DATABASE_PATH", "./instance/app.db")
+    database_mode: str = getenv("DATABASE_MODE", "sync")
+
+    host: str = getenv("HOST", "0.0.0.0")
+    port: int = int(getenv("PORT", "8000"))
+    workers: int = int(getenv("WORKERS", str(cpu_count() or 1)))
+    graceful_timeout: int = int(getenv("GRACEFUL_TIMEOUT", "30"))
+    reload: bool = getenv("RELOAD", "0") == "1"
+
+    journal_mode: str = getenv("SQLITE_JOURNAL_MODE", "WAL")
+    synchronous: str = getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+    busy_timeout: int = int(getenv("SQLITE_BUSY_TIMEOUT", "5000"))
+    cache_size: int = int(getenv("SQLITE_CACHE_SIZE", "-64000"))
+    mmap_size: int = int(getenv("SQLITE_MMAP_SIZE", "268435456"))
+    temp_store: str = getenv("SQLITE_TEMP_STORE", "MEMORY")
+
+    write_pool_size: int = int(getenv("WRITE_POOL_SIZE", "1"))
+    read_pool_size: int = int(getenv("READ_POOL_SIZE", "8"))
+    pool_timeout: int = int(getenv("POOL_TIMEOUT", "30"))
+
+    identity_cache_size: int = int(getenv("IDENTITY_CACHE_SIZE", "10000"))
+    identity_cache_ttl: float = float(getenv("IDENTITY_CACHE_TTL", "30"))
+
+    slow_query_ms: float = float(getenv("SLOW_QUERY_MS", "100"))
+    slow_query_fingerprints: int = int(getenv("SLOW_QUERY_FINGERPRINTS", "500"))
+    debug_endpoints: bool = getenv("DEBUG_ENDPOINTS", "0") == "1"
+
+
+settings = Settings()
@@ -0,0 +1,119 @@
+from logging import getLogger, Logger
+from re import compile, Pattern
+from threading import Lock
+from typing import Any
+
+from sqlalchemy.engine import Connection
+
+from common.settings import settings
+
+logger: Logger = getLogger(__name__)
+
+EXPLAINABLE: tuple[str, ...] = ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH")
+
+LITERALS: Pattern = compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+PLACEHOLDER_LISTS: Pattern = compile(r"\(\?(?:, \?)+\)")
+REPEATED_ROWS: Pattern = compile(r"(\([?, ]+\))(?:, \1)+")
+WHITESPACE: Pattern = compile(r"\s+")
+
+
+def fingerprint(statement: str) -> str:
+    normalized: str = LITERALS.sub("?", WHITESPACE.sub(" ", statement).strip())
+    return REPEATED_ROWS.sub(r"\1, ...", PLACEHOLDER_LISTS.sub("(?, ...)", normalized))
+
+
+class SlowQuery:
+    def __init__(self, fingerprint_text: str) -> None:
+        self.fingerprint: str = fingerprint_text
+        self.count: int = 0
+        self.total_seconds: float = 0.0
+        self.max_seconds: float = 0.0
+        self.statement: str = ""
+        self.parameters: str = ""
+        self.route: str | None = None
+        self.plan: list[str] = []
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "fingerprint": self.fingerprint,
+            "count": self.count,
+            "total_ms": round(self.total_seconds * 1000, 3),
+            "max_ms": round(self.max_seconds * 1000, 3),
+            "statement": self.statement,
+            "parameters": self.parameters,
+            "route": self.route,
+            "plan": self.plan,
+        }
+
+
+class SlowQueryLog:
+    def __init__(self, threshold_ms: float, max_fingerprints: int) -> None:
+        self.threshold: float = threshold_ms / 1000
+        self.max_fingerprints: int = max_fingerprints
+        self._lock: Lock = Lock()
+        self._queries: dict[str, SlowQuery] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self.threshold >= 0
+
+    def observe(
+            self,
+            conn: Connection,
+            statement: str,
+            parameters: Any,
+            executemany: bool,
+            seconds: float,
+            route: str | None,
+    ) -> None:
+        if not self.enabled or seconds < self.threshold:
+            return
+        key: str = fingerprint(statement)
+        with self._lock:
+            entry: SlowQuery | None = self._queries.get(key)
+            slowest: bool = entry is None or seconds > entry.max_seconds
+        example: Any = parameters[0] if executemany and parameters else parameters
+        plan: list[str] = explain(conn, statement, example) if slowest else []
+        with self._lock:
+            entry = self._queries.get(key)
+            if entry is None:
+                if len(self._queries) >= self.max_fingerprints:
+                    del self._queries[min(self._queries.values(), key=lambda query: query.max_seconds).fingerprint]
+                entry = self._queries[key] = SlowQuery(key)
+            entry.count += 1
+            entry.total_seconds += seconds
+            if seconds > entry.max_seconds:
+                entry.max_seconds = seconds
+                entry.statement = statement
+                entry.parameters = repr(example)
+                entry.route = route
+                entry.plan = plan
+        logger.warning(
+            "Slow query %.1f ms on %s: %s %r\n%s",
+            seconds * 1000, route, statement, example, "\n".join(plan),
+        )
+
+    def top(self, limit: int) -> list[dict[str, Any]]:
+        with self._lock:
+            queries: list[SlowQuery] = sorted(self._queries.values(), key=lambda query: query.max_seconds, reverse=True)
+            return [query.as_dict() for query in queries[:limit]]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._queries.clear()
+
+
+def explain(conn: Connection, statement: str, parameters: Any) -> list[str]:
+    if not statement.lstrip().upper().startswith(EXPLAINABLE):
+        return []
+    cursor = conn.connection.cursor()
+    try:
+        cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)
+        return [row[-1] for row in cursor.fetchall()]
+    except Exception as error:
+        return [f"EXPLAIN failed: {error}"]
+    finally:
+        cursor.close()
+
+
+slow_query_log = SlowQueryLog(settings.slow_query_ms, settings.slow_query_fingerprints)
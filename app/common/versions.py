@@ -0,0 +1,191 @@
+from secrets import randbits
+from sqlite3 import Connection as SQLiteConnection, OperationalError, connect
+from threading import Lock
+from typing import Callable, Iterable
+
+from fastapi import Request, Response
+from sqlalchemy import Column, Connection, Integer, String, Table, event, inspect, text
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session, SessionTransaction, ORMExecuteState, UOWTransaction
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from common.database import Base
+from common.settings import settings
+
+EPOCH = ""
+
+change_counters: Table = Table(
+    "change_counters",
+    Base.metadata,
+    Column("name", String(64), primary_key=True),
+    Column("version", Integer, nullable=False),
+)
+
+
+class TableVersions:
+    def __init__(self) -> None:
+        self._lock: Lock = Lock()
+        self._versions: dict[str, int] = {}
+        self._listeners: list[Callable[[set[str]], None]] = []
+
+    def observe(self, versions: dict[str, int]) -> set[str]:
+        with self._lock:
+            changed: set[str] = {table for table, version in versions.items() if self._versions.get(table) != version}
+            self._versions.update(versions)
+        return changed - {EPOCH}
+
+    def subscribe(self, listener: Callable[[set[str]], None]) -> None:
+        self._listeners.append(listener)
+
+    def advance(self, versions: dict[str, int]) -> set[str]:
+        with self._lock:
+            skipped: set[str] = {
+                table for table, version in versions.items() if self._versions.get(table, 0) + 1 != version
+            }
+            self._versions.update(versions)
+        return skipped - {EPOCH}
+
+    def publish(self, versions: dict[str, int]) -> None:
+        self.notify(self.observe(versions))
+
+    def notify(self, changed: set[str]) -> None:
+        if changed:
+            for listener in self._listeners:
+                listener(changed)
+
+    def get(self, table: str) -> int:
+        return self._versions.get(table, 0)
+
+    def etag(self, tables: Iterable[str]) -> str:
+        return f'W/"{self.get(EPOCH):x}-{"-".join(str(self.get(table)) for table in tables)}"'
+
+
+table_versions = TableVersions()
+
+
+class ChangeWatcher:
+    def __init__(self, database_path: str) -> None:
+        self.database_path: str = database_path
+        self._lock: Lock = Lock()
+        self._connection: SQLiteConnection | None = None
+        self._data_version: int | None = None
+
+    def poll(self) -> None:
+        with self._lock:
+            try:
+                if self._connection is None:
+                    self._connection = connect(
+                        f"file:{self.database_path}?mode=ro", uri=True, check_same_thread=False
+                    )
+                data_version: int = self._connection.execute("PRAGMA data_version").fetchone()[0]
+                if data_version == self._data_version:
+                    return
+                versions: dict[str, int] = dict(
+                    self._connection.execute("SELECT name, version FROM change_counters").fetchall()
+                )
+            except OperationalError:
+                return
+            self._data_version = data_version
+        table_versions.publish(versions)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+            self._connection = None
+            self._data_version = None
+
+
+change_watcher = ChangeWatcher(settings.database_path)
+
+
+class CoherenceMiddleware:
+    def __init__(self, app: ASGIApp, watcher: ChangeWatcher = change_watcher) -> None:
+        self.app: ASGIApp = app
+        self.watcher: ChangeWatcher = watcher
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http":
+            self.watcher.poll()
+        await self.app(scope, receive, send)
+
+
+def create_epoch(connection: Connection) -> None:
+    connection.execute(
+        text("INSERT OR IGNORE INTO change_counters (name, version) VALUES (:name, :version)"),
+        {"name": EPOCH, "version": randbits(32)},
+    )
+
+
+@event.listens_for(change_counters, "after_create")
+def seed_epoch(target: Table, connection: Connection, **kwargs) -> None:
+    create_epoch(connection)
+
+
+class NotModified(Exception):
+    def __init__(self, etag: str) -> None:
+        self.etag: str = etag
+
+
+def not_modified_handler(request: Request, exc: NotModified) -> Response:
+    return Response(status_code=304, headers={"ETag": exc.etag})
+
+
+def conditional(*tables: str) -> Callable[[Request, Response], None]:
+    def check_etag(request: Request, response: Response) -> None:
+        etag: str = table_versions.etag(tables)
+        if etag in (tag.strip() for tag in request.headers.get("If-None-Match", "").split(",")):
+            raise NotModified(etag)
+        response.headers["ETag"] = etag
+    return check_etag
+
+
+def changed_tables(session: Session) -> set[str]:
+    return session.info.setdefault("changed_tables", set())
+
+
+def track_instances(session: Session) -> None:
+    tables: set[str] = changed_tables(session)
+    for instance in (*session.new, *session.dirty, *session.deleted):
+        mapper = inspect(instance).mapper
+        tables.update(table.name for table in mapper.tables)
+        tables.update(
+            relationship.secondary.name for relationship in mapper.relationships if relationship.secondary is not None
+        )
+
+
+@event.listens_for(Session, "after_flush")
+def track_flush(session: Session, flush_context: UOWTransaction) -> None:
+    track_instances(session)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def track_statement(orm_execute_state: ORMExecuteState) -> None:
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        changed_tables(orm_execute_state.session).add(orm_execute_state.statement.table.name)
+
+
+@event.listens_for(Session, "before_commit")
+def write_versions(session: Session) -> None:
+    track_instances(session)
+    if not (tables := session.info.get("changed_tables")):
+        return
+    stmt = (
+        insert(change_counters)
+        .values([{"name": table, "version": 1} for table in sorted(tables)])
+        .on_conflict_do_update(index_elements=[change_counters.c.name], set_={"version": change_counters.c.version + 1})
+        .returning(change_counters.c.name, change_counters.c.version)
+    )
+    session.info["committed_versions"] = dict(session.connection().execute(stmt).all())
+
+
+@event.listens_for(Session, "after_commit")
+def publish_versions(session: Session) -> None:
+    session.info.pop("changed_tables", None)
+    table_versions.notify(table_versions.advance(session.info.pop("committed_versions", {})))
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def discard_versions(session: Session, previous_transaction: SessionTransaction) -> None:
+    session.info.pop("changed_tables", None)
+    session.info.pop("committed_versions", None)
@@ -0,0 +1,269 @@
+from typing import Any
+
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from common.abstracts import Pagination
+from common.database import get_async_db
+from common.filters import Sort
+from common.versions import conditional
+from departments import departments_rst, employees_rst, permissions_rst, roles_rst
+from departments.departments_db import Department
+from departments.employees_db import Employee, EmployeeRole
+from departments.roles_db import Role, Permission, RolePermission
+
+department_router = APIRouter(tags=["departments"], prefix="/departments")
+employee_router = APIRouter(tags=["employees"], prefix="/employees")
+role_router = APIRouter(tags=["roles"], prefix="/departments/{department_id}/roles")
+permission_router = APIRouter(tags=["permissions"], prefix="/permissions")
+
+
+async def find_department(db: AsyncSession, department_id: int, schema: type | None = None) -> Department:
+    department: Department | None = await Department.afind_by_id(db, department_id, schema)
+    if department is None:
+        raise HTTPException(status_code=404, detail="Department not found")
+    return department
+
+
+async def check_department(db: AsyncSession, department_id: int) -> None:
+    if not await Department.aexists(db, department_id):
+        raise HTTPException(status_code=404, detail="Department not found")
+
+
+async def find_employee(db: AsyncSession, employee_id: int, schema: type | None = None) -> Employee:
+    employee: Employee | None = await Employee.afind_by_id(db, employee_id, schema)
+    if employee is None:
+        raise HTTPException(status_code=404, detail="Employee not found")
+    return employee
+
+
+async def find_role(db: AsyncSession, department_id: int, role_id: int, schema: type | None = None) -> Role:
+    await check_department(db, department_id)
+    role: Role | None = await Role.afind_by_id(db, role_id, schema)
+    if role is None:
+        raise HTTPException(status_code=404, detail="Role not found")
+    return role
+
+
+@department_router.get(
+    "/",
+    response_model=list[departments_rst.ListModel],
+    dependencies=[Depends(conditional("departments"))],
+)
+async def get_departments(
+        page: Pagination = Depends(),
+        filters: departments_rst.Filters = Depends(),
+        sort: Sort = Depends(departments_rst.sorting),
+        db: AsyncSession = Depends(get_async_db),
+) -> Response:
+    schema: type = departments_rst.ListModel
+    return page.render(await Department.aget_rows(db, page, schema, filters.criteria, sort), schema)
+
+
+@department_router.post("/", response_model=departments_rst.PreviewModel)
+async def create_department(
+        department_data: departments_rst.CreateModel,
+        db: AsyncSession = Depends(get_async_db),
+) -> Department:
+    return await Department.acreate(db, department_data.name, department_data.parent_id)
+
+
+@department_router.get(
+    "/{department_id}/",
+    response_model=departments_rst.FullModel,
+    dependencies=[Depends(conditional("departments", "employees"))],
+)
+async def get_department(department_id: int, db: AsyncSession = Depends(get_async_db)) -> Department:
+    return await find_department(db, department_id, departments_rst.FullModel)
+
+
+@department_router.patch("/{department_id}/", response_model=departments_rst.FullModel)
+async def update_department(
+        department_id: int,
+        update_data: departments_rst.UpdateModel,
+        db: AsyncSession = Depends(get_async_db),
+) -> Department:
+    department: Department = await find_department(db, department_id, departments_rst.FullModel)
+    if update_data.parent_id is not None:
+        departments_rst.check_lineage(
+            await Department.alineage(db, update_data.parent_id, department_id), department_id, update_data.parent_id
+        )
+    department.parent_id = update_data.parent_id
+    department.name = update_data.name or department.name
+    await db.commit()
+    return await find_department(db, department_id, departments_rst.FullModel)
+
+
+@department_router.delete("/{department_id}/")
+async def delete_department(department_id: int, db: AsyncSession = Depends(get_async_db)) -> None:
+    department: Department = await find_department(db, department_id)
+    await department.adelete(db)
+
+
+@employee_router.get(
+    "/",
+    response_model=list[employees_rst.IndexModel],
+    dependencies=[Depends(conditional("employees", "employee_roles", "role_permissions", "permissions"))],
+)
+async def get_employees(
+        page: Pagination = Depends(),
+        filters: employees_rst.Filters = Depends(),
+        sort: Sort = Depends(employees_rst.sorting),
+        db: AsyncSession = Depends(get_async_db),
+) -> Response:
+    schema: type = employees_rst.IndexModel
+    return page.render(await Employee.aget_rows(db, page, schema, filters.criteria, sort), schema)
+
+
+@employee_router.post("/", response_model=employees_rst.PreviewModel)
+async def create_employee(
+        create_data: employees_rst.CreateModel,
+        db: AsyncSession = Depends(get_async_db),
+) -> Employee:
+    if create_data.department_id is not None:
+        await check_department(db, create_data.department_id)
+
+    employee: Employee = await Employee.acreate(db, create_data.name, create_data.surname, create_data.department_id)
+    if create_data.department_id is not None and create_data.roles is not None:
+        roles_list: dict[str, int] = await Role.aget_or_create_many(
+            db,
+            [role.name for role in create_data.roles],
+            department_id=create_data.department_id,
+        )
+        await EmployeeRole.acreate_bulk(db, employee.id, list(roles_list.values()))
+    return await find_employee(db, employee.id, employees_rst.FullModel)
+
+
+@employee_router.get(
+    "/{employee_id}/",
+    response_model=employees_rst.FullModel,
+    dependencies=[Depends(conditional("employees", "roles", "employee_roles"))],
+)
+async def get_employee(employee_id: int, db: AsyncSession = Depends(get_async_db)) -> Employee:
+    return await find_employee(db, employee_id, employees_rst.FullModel)
+
+
+@employee_router.patch("/{employee_id}/", response_model=employees_rst.FullModel)
+async def update_employee(
+        employee_id: int,
+        update_data: employees_rst.UpdateModel,
+        db: AsyncSession = Depends(get_async_db),
+) -> Employee:
+    employee: Employee = await find_employee(db, employee_id, employees_rst.FullModel)
+    update_data: dict[str, Any] = update_data.model_dump(exclude_none=True)
+    for key, value in update_data.items():
+        if key != "roles":
+            setattr(employee, key, value)
+            continue
+        received_roles: set[int] = set(
+            (
+                await Role.aget_or_create_many(
+                    db,
+                    [role["name"] for role in value],
+                    department_id=update_data.get("department_id", employee.department_id),
+                )
+            ).values()
+        )
+        roles_from_db: set[int] = {role.id for role in employee.roles}
+        await EmployeeRole.aupdate_roles(db, employee.id, received_roles, roles_from_db)
+    await db.commit()
+    return await find_employee(db, employee_id, employees_rst.FullModel)
+
+
+@employee_router.delete("/{employee_id}/")
+async def delete_employee(employee_id: int, db: AsyncSession = Depends(get_async_db)) -> None:
+    employee: Employee = await find_employee(db, employee_id)
+    await employee.adelete(db)
+
+
+@role_router.get(
+    "/",
+    response_model=list[roles_rst.ListModel],
+    dependencies=[Depends(conditional("departments", "roles"))],
+)
+async def get_roles(
+        department_id: int,
+        page: Pagination = Depends(),
+        db: AsyncSession = Depends(get_async_db),
+) -> Response:
+    await check_department(db, department_id)
+    schema: type = roles_rst.ListModel
+    return page.render(await Role.aget_rows(db, page, schema, department_id=department_id), schema)
+
+
+@role_router.post("/", response_model=roles_rst.FullModel)
+async def create_role(
+        department_id: int,
+        create_data: roles_rst.CreateModel,
+        db: AsyncSession = Depends(get_async_db),
+) -> Role:
+    await check_department(db, department_id)
+    new_role: Role = await Role.aget_or_create(db, name=create_data.name, department_id=department_id)
+    if create_data.permissions is not None:
+        new_permissions: dict[str, int] = await Permission.aget_or_create_many(db, create_data.permissions)
+        await RolePermission.acreate_bulk(db, new_role.id, list(new_permissions.values()))
+    return await find_role(db, department_id, new_role.id, roles_rst.FullModel)
+
+
+@role_router.get(
+    "/{role_id}/",
+    response_model=roles_rst.FullModel,
+    dependencies=[Depends(conditional("departments", "roles", "role_permissions", "permissions"))],
+)
+async def get_role(department_id: int, role_id: int, db: AsyncSession = Depends(get_async_db)) -> Role:
+    return await find_role(db, department_id, role_id, roles_rst.FullModel)
+
+
+@role_router.patch("/{role_id}/", response_model=roles_rst.FullModel)
+async def update_role(
+        department_id: int,
+        role_id: int,
+        update_data: roles_rst.UpdateModel,
+        db: AsyncSession = Depends(get_async_db),
+) -> Role:
+    role: Role = await find_role(db, department_id, role_id, roles_rst.FullModel)
+    update_data: dict[str, Any] = update_data.model_dump(exclude_none=True)
+    for key, value in update_data.items():
+        if key == "name":
+            value = Role.normalize_name(value)
+            roles_rst.check_role_name(role, await Role.aget_first(db, name=value, department_id=role.department_id))
+        if key != "permissions":
+            setattr(role, key, value)
+            continue
+        received_permissions: set[int] = set((await Permission.aget_or_create_many(db, value)).values())
+        permissions_from_db: set[int] = {permission.id for permission in role.permissions}
+        await RolePermission.aupdate_permissions(db, role.id, received_permissions, permissions_from_db)
+    await db.commit()
+    return await find_role(db, department_id, role_id, roles_rst.FullModel)
+
+
+@role_router.delete("/{role_id}/")
+async def delete_role(department_id: int, role_id: int, db: AsyncSession = Depends(get_async_db)) -> None:
+    role: Role = await find_role(db, department_id, role_id)
+    await role.adelete(db)
+
+
+@permission_router.get(
+    "/",
+    response_model=list[permissions_rst.IndexModel],
+    dependencies=[Depends(conditional("permissions"))],
+)
+async def get_permissions(page: Pagination = Depends(), db: AsyncSession = Depends(get_async_db)) -> Response:
+    schema: type = permissions_rst.IndexModel
+    return page.render(await Permission.aget_rows(db, page, schema), schema)
+
+
+@permission_router.post("/", response_model=permissions_rst.IndexModel)
+async def create_permission(
+        create_data: permissions_rst.CreateModel,
+        db: AsyncSession = Depends(get_async_db),
+) -> Permission:
+    return await Permission.aget_or_create(db, name=create_data.name)
+
+
+@permission_router.delete("/{permission_id}/")
+async def delete_permission(permission_id: int, db: AsyncSession = Depends(get_async_db)) -> None:
+    permission: Permission | None = await Permission.afind_by_id(db, permission_id)
+    if permission is None:
+        raise HTTPException(status_code=404, detail="Permission not found")
+    await permission.adelete(db)
@@ -0,0 +1,114 @@
+from typing import Any, Literal
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.routing import APIRoute
+from pydantic import BaseModel, Field, ValidationError
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from common.database import BatchSession, get_db
+from departments.departments_rst import router as department_router
+from departments.employees_rst import router as employee_router
+from departments.permissions_db import permission_cache
+from departments.permissions_rst import router as permission_router
+from departments.roles_rst import router as role_router
+
+MAX_OPERATIONS = 1000
+REFERENCE_PREFIX = "$ref:"
+
+router = APIRouter(tags=["batch"], prefix="/batch")
+
+ROUTES: list[APIRoute] = [
+    route
+    for source in (department_router, employee_router, role_router, permission_router)
+    for route in source.routes
+    if isinstance(route, APIRoute)
+    and route.methods & {"POST", "PATCH", "DELETE"}
+    and all(dependency.call is get_db for dependency in route.dependant.dependencies)
+]
+
+
+class OperationModel(BaseModel):
+    method: Literal["POST", "PATCH", "DELETE"]
+    path: str
+    body: dict[str, Any] | None = None
+    ref: str | None = None
+
+
+class BatchModel(BaseModel):
+    operations: list[OperationModel] = Field(min_length=1, max_length=MAX_OPERATIONS)
+
+
+class ResultModel(BaseModel):
+    ref: str | None
+    body: Any
+
+
+def resolve(value: Any, refs: dict[str, int]) -> Any:
+    if isinstance(value, dict):
+        return {key: resolve(item, refs) for key, item in value.items()}
+    if isinstance(value, list):
+        return [resolve(item, refs) for item in value]
+    if isinstance(value, str) and value.startswith(REFERENCE_PREFIX):
+        name: str = value.removeprefix(REFERENCE_PREFIX)
+        if name not in refs:
+            raise HTTPException(status_code=422, detail=f"Unknown reference: {name}")
+        return refs[name]
+    return value
+
+
+def find_route(method: str, path: str) -> tuple[APIRoute, dict[str, str]]:
+    for route in ROUTES:
+        match = route.path_regex.match(path)
+        if match is not None and method in route.methods:
+            return route, match.groupdict()
+    raise HTTPException(status_code=404, detail="Route not found")
+
+
+def run_operation(db: Session, operation: OperationModel, refs: dict[str, int]) -> dict[str, Any]:
+    path: str = "/".join(str(resolve(segment, refs)) for segment in operation.path.split("/"))
+    route, path_values = find_route(operation.method, path)
+    arguments: dict[str, Any] = {"db": db}
+    for field in route.dependant.path_params:
+        value, errors = field.validate(path_values[field.name], {}, loc=("path", field.name))
+        if errors:
+            raise HTTPException(status_code=422, detail=f"Invalid path parameter: {field.name}")
+        arguments[field.name] = value
+    for field in route.dependant.body_params:
+        try:
+            arguments[field.name] = field.type_.model_validate(resolve(operation.body or {}, refs))
+        except ValidationError as error:
+            raise HTTPException(status_code=422, detail=error.errors(include_url=False, include_context=False))
+
+    result: Any = route.endpoint(**arguments)
+    body: Any = None
+    if route.response_field is not None:
+        value, _ = route.response_field.validate(result, {}, loc=("response",))
+        body = route.response_field.serialize(value, mode="json")
+    if operation.ref is not None:
+        if not isinstance(body, dict) or "id" not in body:
+            raise HTTPException(status_code=422, detail="Operation result has no id to reference")
+        refs[operation.ref] = body["id"]
+    return {"ref": operation.ref, "body": body}
+
+
+@router.post("/", response_model=list[ResultModel])
+def run_batch(batch_data: BatchModel, db: Session = Depends(get_db)) -> list[dict[str, Any]]:
+    refs: dict[str, int] = {}
+    results: list[dict[str, Any]] = []
+    with BatchSession(bind=db.get_bind(), autoflush=False) as batch:
+        for index, operation in enumerate(batch_data.operations):
+            try:
+                results.append(run_operation(batch, operation, refs))
+            except HTTPException as error:
+                batch.rollback()
+                raise HTTPException(status_code=error.status_code, detail={"operation": index, "detail": error.detail})
+            except SQLAlchemyError as error:
+                batch.rollback()
+                raise HTTPException(
+                    status_code=409 if isinstance(error, IntegrityError) else 500,
+                    detail={"operation": index, "detail": f"Database error: {error.__class__.__name__}"},
+                )
+        batch.commit_batch()
+    permission_cache.clear()
+    return results
@@ -0,0 +1,94 @@
+from typing import Any
+
+from sqlalchemy import (
+    ColumnElement, Connection, Index, MetaData, ScalarSelect, String, delete, event, func, select, text
+)
+from sqlalchemy.orm import Mapped, aliased, mapped_column, Session
+
+from common.database import Base
+
+CHANGE_TABLES: dict[str, tuple[str, str | None]] = {
+    "departments": ("id", None),
+    "employees": ("id", None),
+    "roles": ("id", None),
+    "permissions": ("id", None),
+    "employee_roles": ("employee_id", "role_id"),
+    "role_permissions": ("role_id", "permission_id"),
+}
+
+
+class Change(Base):
+    __tablename__ = "changes"
+    __table_args__ = (
+        Index("ix_changes_key", "entity", "entity_id", "related_id", "seq"),
+        {"sqlite_autoincrement": True},
+    )
+
+    seq: Mapped[int] = mapped_column(primary_key=True)
+    entity: Mapped[str] = mapped_column(String(32))
+    entity_id: Mapped[int]
+    related_id: Mapped[int | None]
+    operation: Mapped[str] = mapped_column(String(8))
+
+    @classmethod
+    def get_since(cls, db: Session, since: int, limit: int) -> list[Any]:
+        return db.execute(
+            select(cls.seq, cls.entity, cls.entity_id, cls.related_id, cls.operation)
+            .where(cls.seq > since)
+            .order_by(cls.seq)
+            .limit(limit)
+        ).all()
+
+    @classmethod
+    def compact(cls, db: Session, through: int | None = None) -> int:
+        later: type[Change] = aliased(cls)
+        newest: ScalarSelect = select(func.max(later.seq)).where(
+            later.entity == cls.entity,
+            later.entity_id == cls.entity_id,
+            later.related_id.is_(cls.related_id),
+        ).scalar_subquery()
+        criteria: list[ColumnElement] = [cls.seq < newest]
+        if through is not None:
+            criteria.append(cls.seq <= through)
+        removed: list[int] = list(
+            db.scalars(delete(cls).where(*criteria).returning(cls.seq).execution_options(synchronize_session=False))
+        )
+        db.commit()
+        return len(removed)
+
+
+def change_ddl(table: str, key: str, related: str | None) -> list[str]:
+    related_new: str = f"new.{related}" if related else "NULL"
+    related_old: str = f"old.{related}" if related else "NULL"
+    record: str = "INSERT INTO changes (entity, entity_id, related_id, operation) VALUES"
+    update: str = (
+        f"{record} ('{table}', new.{key}, NULL, 'update');"
+        if related is None
+        else f"{record} ('{table}', old.{key}, {related_old}, 'delete'), "
+             f"('{table}', new.{key}, {related_new}, 'insert');"
+    )
+    return [
+        f"CREATE TRIGGER IF NOT EXISTS {table}_changes_insert AFTER INSERT ON {table} BEGIN "
+        f"{record} ('{table}', new.{key}, {related_new}, 'insert'); END",
+        f"CREATE TRIGGER IF NOT EXISTS {table}_changes_delete AFTER DELETE ON {table} BEGIN "
+        f"{record} ('{table}', old.{key}, {related_old}, 'delete'); END",
+        f"CREATE TRIGGER IF NOT EXISTS {table}_changes_update AFTER UPDATE ON {table} BEGIN {update} END",
+    ]
+
+
+def create_change_triggers(connection: Connection) -> None:
+    for table, (key, related) in CHANGE_TABLES.items():
+        for statement in change_ddl(table, key, related):
+            connection.execute(text(statement))
+
+
+@event.listens_for(Base.metadata, "after_create")
+def create_change_log(metadata: MetaData, connection: Connection, **kwargs) -> None:
+    create_change_triggers(connection)
+
+
+@event.listens_for(Base.metadata, "before_drop")
+def drop_change_log(metadata: MetaData, connection: Connection, **kwargs) -> None:
+    for table in CHANGE_TABLES:
+        for trigger in ("insert", "delete", "update"):
+            connection.execute(text(f"DROP TRIGGER IF EXISTS {table}_changes_{trigger}"))
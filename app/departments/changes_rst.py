@@ -0,0 +1,46 @@
+from typing import Any
+
+from fastapi import APIRouter, Depends, Query, Response
+from pydantic import BaseModel
+from sqlalchemy.orm import Session
+
+from common.abstracts import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from common.database import get_db, get_read_db
+from departments.changes_db import Change
+
+router = APIRouter(tags=["changes"], prefix="/changes")
+
+
+class ChangeModel(BaseModel):
+    seq: int
+    entity: str
+    entity_id: int
+    related_id: int | None
+    operation: str
+
+
+class CompactModel(BaseModel):
+    through: int | None = None
+
+
+class CompactResultModel(BaseModel):
+    removed: int
+
+
+@router.get("/", response_model=list[ChangeModel])
+def get_changes(
+        response: Response,
+        since: int = Query(0, ge=0),
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+        db: Session = Depends(get_read_db),
+) -> list[Any]:
+    changes: list[Any] = Change.get_since(db, since, limit + 1)
+    if len(changes) > limit:
+        changes = changes[:limit]
+        response.headers["X-Next-Cursor"] = str(changes[-1].seq)
+    return changes
+
+
+@router.post("/compact/", response_model=CompactResultModel)
+def compact_changes(compact_data: CompactModel, db: Session = Depends(get_db)) -> dict[str, Any]:
+    return {"removed": Change.compact(db, compact_data.through)}
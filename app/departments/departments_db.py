@@ -1,19 +1,28 @@
-from typing import Self
+from typing import Any, Self
 
-from sqlalchemy import String, ForeignKey
-from sqlalchemy.orm import Mapped, mapped_column, relationship, Session
+from sqlalchemy import String, ForeignKey, CTE, Index, Select, delete, select, text, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Mapped, mapped_column, relationship, Session, aliased
 
 from common.abstracts import BaseModel
+from departments.employees_db import Employee, EmployeeRole
+from departments.permissions_db import permission_cache
+from departments.roles_db import Role, RolePermission
 
 
 class Department(BaseModel):
     __tablename__ = "departments"
+    __table_args__ = (
+        Index("ix_departments_name_nocase", text("name COLLATE NOCASE")),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     name: Mapped[str] = mapped_column(String(100))
+    archived: Mapped[bool] = mapped_column(default=False, server_default=text("0"))
 
     parent_id: Mapped[int | None] = mapped_column(
         ForeignKey("departments.id", ondelete="SET NULL"),
+        index=True,
     )
     parent = relationship(
         "Department",
@@ -32,3 +41,133 @@ class Department(BaseModel):
         db.add(new_department)
         db.commit()
         return new_department
+
+    @classmethod
+    async def acreate(cls, db: AsyncSession, name: str, parent_id: int | None) -> Self:
+        new_department: Self = cls(name=name, parent_id=parent_id)
+        db.add(new_department)
+        await db.commit()
+        return new_department
+
+    @classmethod
+    def subtree_cte(cls, department_ids: list[int]) -> CTE:
+        tree: CTE = select(cls.id, cls.name, cls.parent_id).where(cls.id.in_(department_ids)).cte(recursive=True)
+        node: type[Self] = aliased(cls)
+        return tree.union(select(node.id, node.name, node.parent_id).where(node.parent_id == tree.c.id))
+
+    @classmethod
+    def ancestors_cte(cls, department_ids: list[int]) -> CTE:
+        chain: CTE = select(cls.id, cls.name, cls.parent_id).where(cls.id.in_(department_ids)).cte(recursive=True)
+        node: type[Self] = aliased(cls)
+        return chain.union(select(node.id, node.name, node.parent_id).where(node.id == chain.c.parent_id))
+
+    @classmethod
+    def select_lineage(cls, parent_id: int, department_id: int) -> Select:
+        chain: CTE = cls.ancestors_cte([parent_id])
+        return select(chain.c.id).where(chain.c.id.in_((parent_id, department_id)))
+
+    @classmethod
+    def lineage(cls, db: Session, parent_id: int, department_id: int) -> set[int]:
+        return set(db.scalars(cls.select_lineage(parent_id, department_id)))
+
+    @classmethod
+    async def alineage(cls, db: AsyncSession, parent_id: int, department_id: int) -> set[int]:
+        return set(await db.scalars(cls.select_lineage(parent_id, department_id)))
+
+    @classmethod
+    def move_subtree(cls, db: Session, department_id: int, parent_id: int | None) -> bool:
+        moved: int = db.execute(
+            update(cls)
+            .where(cls.id == department_id)
+            .values(parent_id=parent_id)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.commit()
+        return moved > 0
+
+    @classmethod
+    def archive_subtree(cls, db: Session, department_id: int, archived: bool) -> int:
+        tree: CTE = cls.subtree_cte([department_id])
+        updated: list[int] = list(
+            db.scalars(
+                update(cls)
+                .where(cls.id.in_(select(tree.c.id)))
+                .values(archived=archived)
+                .returning(cls.id)
+                .execution_options(synchronize_session=False)
+            )
+        )
+        db.commit()
+        return len(updated)
+
+    @classmethod
+    def delete_subtree(cls, db: Session, department_id: int) -> int:
+        tree: CTE = cls.subtree_cte([department_id])
+        departments: list[int] = list(db.scalars(select(tree.c.id)))
+        if not departments:
+            return 0
+        roles: list[int] = list(
+            db.scalars(
+                delete(Role)
+                .where(Role.department_id.in_(cls.id_list(departments)))
+                .returning(Role.id)
+                .execution_options(synchronize_session=False)
+            )
+        )
+        for link in (EmployeeRole, RolePermission):
+            db.execute(
+                delete(link)
+                .where(link.role_id.in_(cls.id_list(roles)))
+                .execution_options(synchronize_session=False)
+            )
+        db.execute(
+            update(Employee)
+            .where(Employee.department_id.in_(cls.id_list(departments)))
+            .values(department_id=None)
+            .execution_options(synchronize_session=False)
+        )
+        db.execute(
+            delete(cls).where(cls.id.in_(cls.id_list(departments))).execution_options(synchronize_session=False)
+        )
+        db.commit()
+        permission_cache.invalidate_roles(roles)
+        return len(departments)
+
+    @classmethod
+    def get_subtree(cls, db: Session, department_id: int) -> list[Any]:
+        tree: CTE = cls.subtree_cte([department_id])
+        return db.execute(select(tree).order_by(tree.c.id)).all()
+
+    @classmethod
+    def get_ancestors(cls, db: Session, department_id: int) -> list[Any]:
+        nodes: dict[int, Any] = cls._fetch_chains(db, [department_id])
+        return cls._chain(nodes, department_id)
+
+    @classmethod
+    def get_path(cls, db: Session, department_id: int, other_id: int) -> list[Any] | None:
+        nodes: dict[int, Any] = cls._fetch_chains(db, [department_id, other_id])
+        source: list[Any] = cls._chain(nodes, department_id)
+        target: list[Any] = cls._chain(nodes, other_id)
+        if not source or not target:
+            return None
+        target_ids: list[int] = [node.id for node in target]
+        for index, node in enumerate(source):
+            if node.id in target_ids:
+                return source[:index] + target[target_ids.index(node.id)::-1]
+        return None
+
+    @classmethod
+    def _fetch_chains(cls, db: Session, department_ids: list[int]) -> dict[int, Any]:
+        chain: CTE = cls.ancestors_cte(department_ids)
+        return {node.id: node for node in db.execute(select(chain)).all()}
+
+    @staticmethod
+    def _chain(nodes: dict[int, Any], department_id: int) -> list[Any]:
+        chain: list[Any] = []
+        visited: set[int] = set()
+        node: Any = nodes.get(department_id)
+        while node is not None and node.id not in visited:
+            chain.append(node)
+            visited.add(node.id)
+            node = nodes.get(node.parent_id)
+        return chain
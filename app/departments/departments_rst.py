@@ -1,11 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Any, ClassVar
+
+from fastapi import APIRouter, Depends, HTTPException, Query as QueryParam, Response
 from pydantic import BaseModel
-from sqlalchemy.orm import Session
+from sqlalchemy import ColumnElement
+from sqlalchemy.orm import Session, joinedload, selectinload
 
-from common.database import get_db
+from common.abstracts import Pagination
+from common.database import get_db, get_read_db
+from common.filters import Sort, equal_or_in, prefix, sort_by
+from common.versions import conditional
 from departments.departments_db import Department
 
+from departments.employees_db import Employee
 from departments.employees_rst import IndexModel as EmployeeModel
+from departments.roles_rst import BulkResultModel, EmployeeIdsModel
 
 
 router = APIRouter(tags=["departments"], prefix="/departments")
@@ -32,14 +40,69 @@ class UpdateModel(CreateModel):
     name: str | None = None
 
 
+class MoveModel(EmployeeIdsModel):
+    keep_roles: bool = True
+
+
+class ParentModel(BaseModel):
+    parent_id: int | None
+
+
+class ArchiveModel(BaseModel):
+    archived: bool = True
+
+
+class SubtreeResultModel(BaseModel):
+    updated: int
+
+
 class FullModel(PreviewModel):
+    loaders: ClassVar[dict] = {"children": joinedload, "employees": selectinload}
+
     children: list[ListModel]
     employees: list[EmployeeModel]
 
 
-@router.get("/", response_model=list[ListModel])
-def get_departments(db: Session = Depends(get_db)) -> list[Department]:
-    return Department.get_list(db)
+class Filters:
+    def __init__(
+            self,
+            parent_id: list[int] | None = QueryParam(None),
+            root: bool | None = QueryParam(None),
+            name: str | None = QueryParam(None, min_length=1, max_length=100),
+            archived: bool = QueryParam(False),
+    ) -> None:
+        self.criteria: list[ColumnElement] = [
+            *equal_or_in(Department.parent_id, parent_id),
+            *prefix(Department.name, name),
+            Department.archived == archived,
+        ]
+        if root is not None:
+            self.criteria.append(Department.parent_id.is_(None) if root else Department.parent_id.is_not(None))
+
+
+sorting = sort_by("DepartmentSort", "name")
+
+
+def check_lineage(lineage: set[int], department_id: int, parent_id: int) -> None:
+    if parent_id not in lineage:
+        raise HTTPException(status_code=404, detail="Department not found")
+    if department_id in lineage:
+        raise HTTPException(status_code=409, detail="Department cannot be moved into its own subtree")
+
+
+def check_parent(db: Session, department_id: int, parent_id: int | None) -> None:
+    if parent_id is not None:
+        check_lineage(Department.lineage(db, parent_id, department_id), department_id, parent_id)
+
+
+@router.get("/", response_model=list[ListModel], dependencies=[Depends(conditional("departments"))])
+def get_departments(
+        page: Pagination = Depends(),
+        filters: Filters = Depends(),
+        sort: Sort = Depends(sorting),
+        db: Session = Depends(get_read_db),
+) -> Response:
+    return page.render(Department.get_rows(db, page, ListModel, filters.criteria, sort), ListModel)
 
 
 @router.post("/", response_model=PreviewModel)
@@ -47,9 +110,13 @@ def create_department(department_data: CreateModel, db: Session = Depends(get_db
     return Department.create(db, department_data.name, department_data.parent_id)
 
 
-@router.get("/{department_id}/", response_model=FullModel)
-def get_department(department_id: int, db: Session = Depends(get_db)) -> Department:
-    department: Department = Department.find_by_id(db, department_id)
+@router.get(
+    "/{department_id}/",
+    response_model=FullModel,
+    dependencies=[Depends(conditional("departments", "employees"))],
+)
+def get_department(department_id: int, db: Session = Depends(get_read_db)) -> Department:
+    department: Department = Department.find_by_id(db, department_id, FullModel)
     if department is None:
         raise HTTPException(status_code=404, detail="Department not found")
     return department
@@ -58,10 +125,10 @@ def get_department(department_id: int, db: Session = Depends(get_db)) -> Departm
 @router.patch("/{department_id}/", response_model=FullModel)
 def update_department(department_id: int, update_data: UpdateModel, db: Session = Depends(get_db)) -> Department:
     department: Department = Department.find_by_id(db, department_id)
-    parent: Department = Department.find_by_id(db, update_data.parent_id)
-    if parent is None and update_data.parent_id is not None or department is None:
+    if department is None:
         raise HTTPException(status_code=404, detail="Department not found")
-    department.parent_id = update_data.parent_id if parent not in department.children else department.parent_id
+    check_parent(db, department_id, update_data.parent_id)
+    department.parent_id = update_data.parent_id
     department.name = update_data.name or department.name
     db.add(department)
     db.commit()
@@ -74,3 +141,82 @@ def delete_department(department_id: int, db: Session = Depends(get_db)) -> None
     if department is None:
         raise HTTPException(status_code=404, detail="Department not found")
     department.delete(db)
+
+
+@router.post("/{department_id}/employees/move/", response_model=BulkResultModel)
+def move_employees(department_id: int, move_data: MoveModel, db: Session = Depends(get_db)) -> dict[str, Any]:
+    if not Department.exists(db, department_id):
+        raise HTTPException(status_code=404, detail="Department not found")
+    moved: set[int] = set(Employee.move_bulk(db, move_data.employee_ids, department_id, move_data.keep_roles))
+    return {
+        "updated": len(moved),
+        "missing": [employee_id for employee_id in dict.fromkeys(move_data.employee_ids) if employee_id not in moved],
+    }
+
+
+@router.get(
+    "/{department_id}/subtree/",
+    response_model=list[PreviewModel],
+    dependencies=[Depends(conditional("departments"))],
+)
+def get_department_subtree(department_id: int, db: Session = Depends(get_read_db)) -> list[Any]:
+    subtree: list[Any] = Department.get_subtree(db, department_id)
+    if not subtree:
+        raise HTTPException(status_code=404, detail="Department not found")
+    return subtree
+
+
+@router.get(
+    "/{department_id}/ancestors/",
+    response_model=list[PreviewModel],
+    dependencies=[Depends(conditional("departments"))],
+)
+def get_department_ancestors(department_id: int, db: Session = Depends(get_read_db)) -> list[Any]:
+    chain: list[Any] = Department.get_ancestors(db, department_id)
+    if not chain:
+        raise HTTPException(status_code=404, detail="Department not found")
+    return chain[1:]
+
+
+@router.get(
+    "/{department_id}/path/{other_id}/",
+    response_model=list[PreviewModel],
+    dependencies=[Depends(conditional("departments"))],
+)
+def get_department_path(department_id: int, other_id: int, db: Session = Depends(get_read_db)) -> list[Any]:
+    path: list[Any] | None = Department.get_path(db, department_id, other_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Path not found")
+    return path
+
+
+@router.post("/{department_id}/subtree/move/", response_model=SubtreeResultModel)
+def move_department_subtree(
+        department_id: int,
+        move_data: ParentModel,
+        db: Session = Depends(get_db),
+) -> dict[str, Any]:
+    check_parent(db, department_id, move_data.parent_id)
+    if not Department.move_subtree(db, department_id, move_data.parent_id):
+        raise HTTPException(status_code=404, detail="Department not found")
+    return {"updated": 1}
+
+
+@router.post("/{department_id}/subtree/archive/", response_model=SubtreeResultModel)
+def archive_department_subtree(
+        department_id: int,
+        archive_data: ArchiveModel,
+        db: Session = Depends(get_db),
+) -> dict[str, Any]:
+    archived: int = Department.archive_subtree(db, department_id, archive_data.archived)
+    if not archived:
+        raise HTTPException(status_code=404, detail="Department not found")
+    return {"updated": archived}
+
+
+@router.delete("/{department_id}/subtree/", response_model=SubtreeResultModel)
+def delete_department_subtree(department_id: int, db: Session = Depends(get_db)) -> dict[str, Any]:
+    deleted: int = Department.delete_subtree(db, department_id)
+    if not deleted:
+        raise HTTPException(status_code=404, detail="Department not found")
+    return {"updated": deleted}
@@ -1,10 +1,12 @@
 from typing import Self
 
-from sqlalchemy import String, ForeignKey
+from sqlalchemy import String, ForeignKey, Index, Table, delete, insert, literal, select, text, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Mapped, mapped_column, relationship, Session, Query
 
 from common.abstracts import BaseModel
 from common.database import Base
+from departments.permissions_db import permission_cache
 
 
 class EmployeeRole(Base):
@@ -17,6 +19,7 @@ class EmployeeRole(Base):
     role_id: Mapped[int] = mapped_column(
         ForeignKey("roles.id", ondelete="CASCADE"),
         primary_key=True,
+        index=True,
     )
 
     @classmethod
@@ -25,6 +28,7 @@ class EmployeeRole(Base):
             cls(employee_id=employee_id, role_id=role) for role in roles
         )
         db.commit()
+        permission_cache.invalidate_employees({employee_id})
 
     @classmethod
     def delete_by_ids(cls, db: Session, employee_id: int, roles: set[int]) -> None:
@@ -34,6 +38,7 @@ class EmployeeRole(Base):
         )
         stmt.delete()
         db.commit()
+        permission_cache.invalidate_employees({employee_id})
 
     @classmethod
     def update_roles(
@@ -46,16 +51,69 @@ class EmployeeRole(Base):
         cls.delete_by_ids(db, employee_id, db_data - new_data)
         cls.create_bulk(db, employee_id, list(new_data - db_data))
 
+    @classmethod
+    def assign_bulk(cls, db: Session, role_id: int, employees: list[int]) -> int:
+        assigned: int = db.execute(
+            insert(cls)
+            .prefix_with("OR IGNORE")
+            .from_select(
+                ["employee_id", "role_id"],
+                select(Employee.id, literal(role_id)).where(Employee.id.in_(Employee.id_list(employees))),
+            )
+        ).rowcount
+        db.commit()
+        permission_cache.invalidate_employees(set(employees))
+        return assigned
+
+    @classmethod
+    def revoke_bulk(cls, db: Session, role_id: int, employees: list[int]) -> int:
+        revoked: int = db.execute(
+            delete(cls).where(cls.role_id == role_id, cls.employee_id.in_(Employee.id_list(employees)))
+        ).rowcount
+        db.commit()
+        permission_cache.invalidate_employees(set(employees))
+        return revoked
+
+    @classmethod
+    async def acreate_bulk(cls, db: AsyncSession, employee_id: int, roles: list[int]) -> None:
+        db.add_all(
+            cls(employee_id=employee_id, role_id=role) for role in roles
+        )
+        await db.commit()
+        permission_cache.invalidate_employees({employee_id})
+
+    @classmethod
+    async def adelete_by_ids(cls, db: AsyncSession, employee_id: int, roles: set[int]) -> None:
+        await db.execute(delete(cls).where(cls.employee_id == employee_id, cls.role_id.in_(roles)))
+        await db.commit()
+        permission_cache.invalidate_employees({employee_id})
+
+    @classmethod
+    async def aupdate_roles(
+            cls,
+            db: AsyncSession,
+            employee_id: int,
+            new_data: set[int],
+            db_data: set[int],
+    ) -> None:
+        await cls.adelete_by_ids(db, employee_id, db_data - new_data)
+        await cls.acreate_bulk(db, employee_id, list(new_data - db_data))
+
 
 class Employee(BaseModel):
     __tablename__ = "employees"
+    __table_args__ = (
+        Index("ix_employees_name_nocase", text("name COLLATE NOCASE")),
+        Index("ix_employees_surname_nocase", text("surname COLLATE NOCASE")),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     name: Mapped[str] = mapped_column(String(20))
     surname: Mapped[str] = mapped_column(String(20))
 
     department_id: Mapped[int | None] = mapped_column(
-        ForeignKey("departments.id", ondelete="SET NULL")
+        ForeignKey("departments.id", ondelete="SET NULL"),
+        index=True,
     )
 
     roles = relationship("Role", secondary=EmployeeRole.__table__, back_populates="employees")
@@ -66,3 +124,41 @@ class Employee(BaseModel):
         db.add(new_employee)
         db.commit()
         return new_employee
+
+    @classmethod
+    async def acreate(cls, db: AsyncSession, name: str, surname: str, department_id: int | None) -> Self:
+        new_employee: Self = cls(name=name, surname=surname, department_id=department_id)
+        db.add(new_employee)
+        await db.commit()
+        return new_employee
+
+    @classmethod
+    def move_bulk(cls, db: Session, employees: list[int], department_id: int, keep_roles: bool) -> list[int]:
+        moved: list[int] = list(
+            db.scalars(
+                update(cls)
+                .where(cls.id.in_(cls.id_list(employees)))
+                .values(department_id=department_id)
+                .returning(cls.id),
+                execution_options={"synchronize_session": False},
+            )
+        )
+        if not keep_roles and moved:
+            roles: Table = Base.metadata.tables["roles"]
+            db.execute(
+                delete(EmployeeRole).where(
+                    EmployeeRole.employee_id.in_(cls.id_list(moved)),
+                    EmployeeRole.role_id.not_in(select(roles.c.id).where(roles.c.department_id == department_id)),
+                )
+            )
+        db.commit()
+        permission_cache.invalidate_employees(set(moved))
+        return moved
+
+    def delete(self, db: Session) -> None:
+        super().delete(db)
+        permission_cache.invalidate_employees({self.id})
+
+    async def adelete(self, db: AsyncSession) -> None:
+        await super().adelete(db)
+        permission_cache.invalidate_employees({self.id})
@@ -1,15 +1,20 @@
-from typing import Any
+from typing import Any, ClassVar
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query as QueryParam, Response
 from pydantic import BaseModel
-from sqlalchemy.orm import Session
+from sqlalchemy import ColumnElement, exists
+from sqlalchemy.orm import Session, selectinload
 
-from common.database import get_db
+from common.abstracts import Pagination
+from common.database import get_db, get_read_db
+from common.filters import Sort, equal_or_in, prefix, sort_by
+from common.versions import conditional
 from departments.departments_db import Department
 from departments.employees_db import Employee, EmployeeRole
+from departments.permissions_db import EffectivePermissions
 from departments.roles_rst import ListModel as ListRoleModel
 from departments.roles_rst import NameModel as NameRoleModel
-from departments.roles_db import Role
+from departments.roles_db import Role, Permission, RolePermission
 
 router = APIRouter(tags=["employees"], prefix="/employees")
 
@@ -44,37 +49,109 @@ class UpdateModel(CreateModel):
 
 
 class FullModel(PreviewModel):
+    loaders: ClassVar[dict] = {"roles": selectinload}
+
     roles: list[ListRoleModel]
 
 
-@router.get("/", response_model=list[IndexModel])
-def get_employees(db: Session = Depends(get_db)) -> list[Employee]:
-    return Employee.get_list(db)
+class PermissionModel(BaseModel):
+    id: int
+    name: str
+
+
+class PermissionsModel(BaseModel):
+    employee_id: int
+    roles: list[int]
+    permissions: list[PermissionModel]
+
+
+class CheckModel(BaseModel):
+    permissions: list[str]
+
+
+class CheckResultModel(BaseModel):
+    allowed: bool
+    missing: list[str]
+
+
+class Filters:
+    def __init__(
+            self,
+            department_id: list[int] | None = QueryParam(None),
+            name: str | None = QueryParam(None, min_length=1, max_length=20),
+            surname: str | None = QueryParam(None, min_length=1, max_length=20),
+            role_id: list[int] | None = QueryParam(None),
+            permission: list[str] | None = QueryParam(None),
+    ) -> None:
+        self.criteria: list[ColumnElement] = [
+            *equal_or_in(Employee.department_id, department_id),
+            *prefix(Employee.name, name),
+            *prefix(Employee.surname, surname),
+        ]
+        if role_id:
+            self.criteria.append(
+                exists().where(EmployeeRole.employee_id == Employee.id, EmployeeRole.role_id.in_(role_id))
+            )
+        if permission:
+            names: list[str] = [Permission.normalize_name(name) for name in permission]
+            self.criteria.append(
+                exists().where(
+                    EmployeeRole.employee_id == Employee.id,
+                    RolePermission.role_id == EmployeeRole.role_id,
+                    Permission.id == RolePermission.permission_id,
+                    Permission.name.in_(names),
+                )
+            )
+
+
+sorting = sort_by("EmployeeSort", "name", "surname")
+
+
+def get_effective_permissions(db: Session, employee_id: int) -> EffectivePermissions:
+    effective: EffectivePermissions | None = Permission.get_effective(db, employee_id)
+    if effective is None:
+        raise HTTPException(status_code=404, detail="Employee not found")
+    return effective
+
+
+@router.get(
+    "/",
+    response_model=list[IndexModel],
+    dependencies=[Depends(conditional("employees", "employee_roles", "role_permissions", "permissions"))],
+)
+def get_employees(
+        page: Pagination = Depends(),
+        filters: Filters = Depends(),
+        sort: Sort = Depends(sorting),
+        db: Session = Depends(get_read_db),
+) -> Response:
+    return page.render(Employee.get_rows(db, page, IndexModel, filters.criteria, sort), IndexModel)
 
 
 @router.post("/", response_model=PreviewModel)
 def create_employee(create_data: CreateModel, db: Session = Depends(get_db)) -> Employee:
     if create_data.department_id is not None:
-        if Department.find_by_id(db, create_data.department_id) is None:
+        if not Department.exists(db, create_data.department_id):
             raise HTTPException(status_code=404, detail="Department not found")
 
     employee: Employee = Employee.create(db, create_data.name, create_data.surname, create_data.department_id)
     if create_data.department_id is not None and create_data.roles is not None:
-        roles_list: list[int] = [
-            Role.get_or_create(
-                db,
-                name=role.model_dump()["name"],
-                department_id=create_data.department_id,
-            ).id
-            for role in create_data.roles
-        ]
-        EmployeeRole.create_bulk(db, employee.id, roles_list)
+        roles_list: dict[str, int] = Role.get_or_create_many(
+            db,
+            [role.name for role in create_data.roles],
+            department_id=create_data.department_id,
+        )
+        EmployeeRole.create_bulk(db, employee.id, list(roles_list.values()))
     return employee
 
 
-@router.get("/{employee_id}/", response_model=FullModel)
-def get_employee(employee_id: int, db: Session = Depends(get_db)) -> Employee:
-    employee: Employee = Employee.find_by_id(db, employee_id)
+@router.get(
+    "/{employee_id}/",
+    response_model=FullModel,
+    dependencies=[Depends(conditional("employees", "roles", "employee_roles"))],
+)
+def get_employee(employee_id: int, db: Session = Depends(get_read_db)) -> Employee:
+    employee: Employee = Employee.find_by_id(db, employee_id, FullModel)
     if employee is None:
         raise HTTPException(status_code=404, detail="Employee not found")
     return employee
@@ -90,12 +167,16 @@ def update_employee(employee_id: int, update_data: UpdateModel, db: Session = De
         if key != "roles":
             setattr(employee, key, value)
             continue
-        received_roles: set[int] = {
-            Role.get_or_create(db, name=role["name"], department_id=update_data["department_id"]).id
-            for role in value
-        }
+        received_roles: set[int] = set(
+            Role.get_or_create_many(
+                db,
+                [role["name"] for role in value],
+                department_id=update_data.get("department_id", employee.department_id),
+            ).values()
+        )
         roles_from_db: set[int] = {role.id for role in employee.roles}
         EmployeeRole.update_roles(db, employee.id, received_roles, roles_from_db)
+    db.commit()
     return employee
 
 
@@ -105,3 +186,31 @@ def delete_employee(employee_id: int, db: Session = Depends(get_db)) -> None:
     if employee is None:
         raise HTTPException(status_code=404, detail="Employee not found")
     employee.delete(db)
+
+
+@router.get(
+    "/{employee_id}/permissions/",
+    response_model=PermissionsModel,
+    dependencies=[Depends(conditional("employees", "employee_roles", "role_permissions", "permissions"))],
+)
+def get_employee_permissions(employee_id: int, db: Session = Depends(get_read_db)) -> dict[str, Any]:
+    effective: EffectivePermissions = get_effective_permissions(db, employee_id)
+    return {
+        "employee_id": effective.employee_id,
+        "roles": sorted(effective.roles),
+        "permissions": [
+            {"id": permission_id, "name": name}
+            for name, permission_id in sorted(effective.permissions.items(), key=lambda item: item[1])
+        ],
+    }
+
+
+@router.post("/{employee_id}/permissions/check/", response_model=CheckResultModel)
+def check_employee_permissions(
+        employee_id: int,
+        check_data: CheckModel,
+        db: Session = Depends(get_read_db),
+) -> dict[str, Any]:
+    effective: EffectivePermissions = get_effective_permissions(db, employee_id)
+    missing: list[str] = effective.missing(Permission.normalize_name(name) for name in check_data.permissions)
+    return {"allowed": not missing, "missing": missing}
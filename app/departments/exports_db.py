@@ -0,0 +1,74 @@
+from typing import Any, Iterator
+
+from sqlalchemy import CTE, Select, literal, or_, select
+from sqlalchemy.orm import Session, aliased
+
+from departments.departments_db import Department
+from departments.employees_db import Employee, EmployeeRole
+from departments.roles_db import Role, Permission, RolePermission
+
+YIELD_PER = 1000
+
+COLUMNS: tuple[str, ...] = (
+    "type", "key", "name", "surname", "parent", "department", "employee", "role", "permission",
+)
+
+
+def select_departments() -> Select:
+    parent: type[Department] = aliased(Department)
+    tree: CTE = select(
+        Department.id, Department.name, Department.parent_id, literal(0).label("depth")
+    ).where(
+        or_(Department.parent_id.is_(None), ~select(parent.id).where(parent.id == Department.parent_id).exists())
+    ).cte(recursive=True)
+    node: type[Department] = aliased(Department)
+    tree = tree.union_all(
+        select(node.id, node.name, node.parent_id, tree.c.depth + 1).where(node.parent_id == tree.c.id)
+    )
+    unreachable: Select = select(Department.id, Department.name, Department.parent_id, literal(None)).where(
+        Department.id.not_in(select(tree.c.id))
+    )
+    ordered: CTE = select(tree).union_all(unreachable).cte("ordered")
+    return select(ordered.c.id, ordered.c.name, ordered.c.parent_id).order_by(
+        ordered.c.depth.is_(None), ordered.c.depth, ordered.c.id
+    )
+
+
+EXPORTS: tuple[tuple[str, Select, tuple[str, ...]], ...] = (
+    ("department", select_departments(), ("key", "name", "parent")),
+    (
+        "permission",
+        select(Permission.id, Permission.name).order_by(Permission.id),
+        ("key", "name"),
+    ),
+    (
+        "role",
+        select(Role.id, Role.name, Role.department_id).order_by(Role.id),
+        ("key", "name", "department"),
+    ),
+    (
+        "employee",
+        select(Employee.id, Employee.name, Employee.surname, Employee.department_id).order_by(Employee.id),
+        ("key", "name", "surname", "department"),
+    ),
+    (
+        "employee_role",
+        select(EmployeeRole.employee_id, EmployeeRole.role_id),
+        ("employee", "role"),
+    ),
+    (
+        "role_permission",
+        select(RolePermission.role_id, RolePermission.permission_id),
+        ("role", "permission"),
+    ),
+)
+
+
+def iter_org(db: Session) -> Iterator[dict[str, Any]]:
+    db.connection().exec_driver_sql("BEGIN")
+    try:
+        for kind, statement, fields in EXPORTS:
+            for row in db.execute(statement.execution_options(yield_per=YIELD_PER)):
+                yield {"type": kind, **dict(zip(fields, row))}
+    finally:
+        db.rollback()
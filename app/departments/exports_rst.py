@@ -0,0 +1,55 @@
+from csv import DictWriter
+from enum import Enum
+from io import StringIO
+from itertools import islice
+from json import dumps
+from typing import Any, Iterator
+
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from common.database import get_read_db
+from common.versions import conditional
+from departments.exports_db import COLUMNS, YIELD_PER, iter_org
+
+router = APIRouter(tags=["export"], prefix="/export")
+
+
+class ExportFormat(str, Enum):
+    ndjson = "ndjson"
+    csv = "csv"
+
+
+def iter_ndjson(rows: Iterator[dict[str, Any]]) -> Iterator[str]:
+    while batch := list(islice(rows, YIELD_PER)):
+        yield "".join(dumps(row) + "\n" for row in batch)
+
+
+def iter_csv(rows: Iterator[dict[str, Any]]) -> Iterator[str]:
+    buffer: StringIO = StringIO()
+    writer: DictWriter = DictWriter(buffer, fieldnames=COLUMNS)
+    writer.writeheader()
+    while batch := list(islice(rows, YIELD_PER)):
+        writer.writerows(batch)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+@router.get(
+    "/",
+    response_class=StreamingResponse,
+    dependencies=[
+        Depends(conditional("departments", "permissions", "roles", "employees", "employee_roles", "role_permissions"))
+    ],
+)
+def export_org(
+        export_format: ExportFormat = Query(ExportFormat.ndjson, alias="format"),
+        db: Session = Depends(get_read_db),
+) -> StreamingResponse:
+    if export_format is ExportFormat.csv:
+        return StreamingResponse(iter_csv(iter_org(db)), media_type="text/csv")
+    return StreamingResponse(iter_ndjson(iter_org(db)), media_type="application/x-ndjson")
@@ -0,0 +1,240 @@
+from json import loads
+from typing import Any
+
+from sqlalchemy import insert, select, update, bindparam, tuple_
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from departments.departments_db import Department
+from departments.employees_db import Employee, EmployeeRole
+from departments.permissions_db import permission_cache
+from departments.roles_db import Role, Permission, RolePermission
+
+MAX_REPORTED_ERRORS = 1000
+
+FIELDS: dict[str, tuple[str, ...]] = {
+    "department": ("key", "name"),
+    "permission": ("key", "name"),
+    "role": ("key", "name", "department"),
+    "employee": ("key", "name", "surname"),
+    "employee_role": ("employee", "role"),
+    "role_permission": ("role", "permission"),
+}
+
+
+class OrgImporter:
+    def __init__(self, db: Session) -> None:
+        self.db: Session = db
+        self.keys: dict[str, dict[str, int]] = {kind: {} for kind in ("department", "permission", "role", "employee")}
+        self.imported: dict[str, int] = {kind: 0 for kind in FIELDS}
+        self.failed: int = 0
+        self.errors: list[dict[str, Any]] = []
+        self.rejected: set[int] = set()
+
+    def load(self, lines: list[tuple[int, bytes]]) -> None:
+        pending: dict[str, list[tuple[int, dict[str, Any]]]] = {kind: [] for kind in FIELDS}
+        self.rejected = set()
+        for number, line in lines:
+            try:
+                record: dict[str, Any] = loads(line)
+                fields: tuple[str, ...] = FIELDS[record["type"]]
+            except (ValueError, TypeError, KeyError):
+                self._error(number, "Unknown record type")
+                continue
+            if missing := [field for field in fields if record.get(field) is None]:
+                self._error(number, f"Missing fields: {', '.join(missing)}")
+                continue
+            pending[record["type"]].append((number, record))
+
+        before: dict[str, dict[str, int]] = {kind: keys.copy() for kind, keys in self.keys.items()}
+        imported: dict[str, int] = {}
+        try:
+            imported["department"] = self._load_departments(pending["department"])
+            imported["permission"] = self._load_permissions(pending["permission"])
+            imported["role"] = self._load_roles(pending["role"])
+            imported["employee"] = self._load_employees(pending["employee"])
+            imported["employee_role"] = self._load_links(
+                pending["employee_role"], EmployeeRole, ("employee", "employee_id"), ("role", "role_id")
+            )
+            imported["role_permission"] = self._load_links(
+                pending["role_permission"], RolePermission, ("role", "role_id"), ("permission", "permission_id")
+            )
+            self.db.commit()
+        except SQLAlchemyError as error:
+            self.db.rollback()
+            self.keys = before
+            for records in pending.values():
+                for number, _ in records:
+                    if number not in self.rejected:
+                        self._error(number, f"Chunk rolled back: {error.__class__.__name__}")
+            return
+        if imported["employee_role"] or imported["role_permission"]:
+            permission_cache.clear()
+        for kind, count in imported.items():
+            self.imported[kind] += count
+
+    def result(self) -> dict[str, Any]:
+        return {"imported": self.imported, "failed": self.failed, "errors": self.errors}
+
+    def _load_departments(self, records: list[tuple[int, dict[str, Any]]]) -> int:
+        records = self._unique(records, "department")
+        parents: dict[str, str | None] = {
+            str(record["key"]): None if record.get("parent") is None else str(record["parent"])
+            for _, record in records
+        }
+        children: dict[str, list[str]] = {}
+        accepted: list[str] = []
+        for key, parent in parents.items():
+            if parent is None or parent in self.keys["department"]:
+                accepted.append(key)
+            else:
+                children.setdefault(parent, []).append(key)
+        for key in accepted:
+            accepted.extend(children.pop(key, []))
+        resolved: set[str] = set(accepted)
+        cyclic: set[str] = self._cycles({key: parent for key, parent in parents.items() if key not in resolved})
+
+        valid: list[tuple[int, dict[str, Any]]] = []
+        for number, record in records:
+            key: str = str(record["key"])
+            if key in cyclic:
+                self._error(number, f"Department cycle: {key}")
+            elif key not in resolved:
+                self._error(number, f"Unknown department: {record['parent']}")
+            else:
+                valid.append((number, record))
+        ids: list[int] = self._insert(Department, [{"name": record["name"]} for _, record in valid])
+        self._remember("department", valid, ids)
+
+        parents: list[dict[str, int]] = [
+            {"row_id": row_id, "new_parent_id": self.keys["department"][str(record["parent"])]}
+            for (_, record), row_id in zip(valid, ids)
+            if record.get("parent") is not None
+        ]
+        if parents:
+            self.db.execute(
+                update(Department.__table__)
+                .where(Department.__table__.c.id == bindparam("row_id"))
+                .values(parent_id=bindparam("new_parent_id")),
+                parents,
+            )
+        return len(valid)
+
+    @staticmethod
+    def _cycles(parents: dict[str, str | None]) -> set[str]:
+        cyclic: set[str] = set()
+        visited: set[str] = set()
+        for start in parents:
+            path: list[str] = []
+            key: str | None = start
+            while key in parents and key not in visited:
+                visited.add(key)
+                path.append(key)
+                key = parents[key]
+            if key in path:
+                cyclic.update(path[path.index(key):])
+        return cyclic
+
+    def _load_permissions(self, records: list[tuple[int, dict[str, Any]]]) -> int:
+        records = self._unique(records, "permission")
+        names: list[str] = [Permission.normalize_name(str(record["name"])) for _, record in records]
+        if not names:
+            return 0
+        self.db.execute(
+            sqlite_insert(Permission).on_conflict_do_nothing(index_elements=["name"]),
+            [{"name": name} for name in set(names)],
+        )
+        found: dict[str, int] = dict(
+            self.db.execute(select(Permission.name, Permission.id).where(Permission.name.in_(set(names)))).all()
+        )
+        self._remember("permission", records, [found[name] for name in names])
+        return len(records)
+
+    def _load_roles(self, records: list[tuple[int, dict[str, Any]]]) -> int:
+        valid: list[tuple[int, dict[str, Any]]] = []
+        rows: list[dict[str, Any]] = []
+        for number, record in self._unique(records, "role"):
+            department_id: int | None = self._resolve(number, "department", record["department"])
+            if department_id is None:
+                continue
+            valid.append((number, record))
+            rows.append({"name": Role.normalize_name(str(record["name"])), "department_id": department_id})
+        if not rows:
+            return 0
+        self.db.execute(sqlite_insert(Role).on_conflict_do_nothing(), rows)
+        pairs: list[tuple[int, str]] = [(row["department_id"], row["name"]) for row in rows]
+        found: dict[tuple[int, str], int] = {
+            (department_id, name): role_id
+            for department_id, name, role_id in self.db.execute(
+                select(Role.department_id, Role.name, Role.id).where(
+                    tuple_(Role.department_id, Role.name).in_(set(pairs))
+                )
+            )
+        }
+        self._remember("role", valid, [found[pair] for pair in pairs])
+        return len(valid)
+
+    def _load_employees(self, records: list[tuple[int, dict[str, Any]]]) -> int:
+        valid: list[tuple[int, dict[str, Any]]] = []
+        rows: list[dict[str, Any]] = []
+        for number, record in self._unique(records, "employee"):
+            department_id: int | None = None
+            if record.get("department") is not None:
+                department_id = self._resolve(number, "department", record["department"])
+                if department_id is None:
+                    continue
+            valid.append((number, record))
+            rows.append({"name": record["name"], "surname": record["surname"], "department_id": department_id})
+        self._remember("employee", valid, self._insert(Employee, rows))
+        return len(valid)
+
+    def _load_links(
+            self,
+            records: list[tuple[int, dict[str, Any]]],
+            table: type,
+            left: tuple[str, str],
+            right: tuple[str, str],
+    ) -> int:
+        rows: list[dict[str, int]] = []
+        for number, record in records:
+            left_id: int | None = self._resolve(number, left[0], record[left[0]])
+            right_id: int | None = self._resolve(number, right[0], record[right[0]]) if left_id is not None else None
+            if right_id is not None:
+                rows.append({left[1]: left_id, right[1]: right_id})
+        if rows:
+            self.db.execute(insert(table).prefix_with("OR IGNORE"), rows)
+        return len(rows)
+
+    def _insert(self, table: type, rows: list[dict[str, Any]]) -> list[int]:
+        if not rows:
+            return []
+        return list(self.db.scalars(insert(table).returning(table.id, sort_by_parameter_order=True), rows))
+
+    def _unique(self, records: list[tuple[int, dict[str, Any]]], kind: str) -> list[tuple[int, dict[str, Any]]]:
+        seen: set[str] = set()
+        unique: list[tuple[int, dict[str, Any]]] = []
+        for number, record in records:
+            key: str = str(record["key"])
+            if key in seen or key in self.keys[kind]:
+                self._error(number, f"Duplicate {kind} key: {key}")
+                continue
+            seen.add(key)
+            unique.append((number, record))
+        return unique
+
+    def _remember(self, kind: str, records: list[tuple[int, dict[str, Any]]], ids: list[int]) -> None:
+        for (_, record), row_id in zip(records, ids):
+            self.keys[kind][str(record["key"])] = row_id
+
+    def _resolve(self, number: int, kind: str, key: Any) -> int | None:
+        row_id: int | None = self.keys[kind].get(str(key))
+        if row_id is None:
+            self._error(number, f"Unknown {kind}: {key}")
+        return row_id
+
+    def _error(self, number: int, detail: str) -> None:
+        self.rejected.add(number)
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": number, "detail": detail})
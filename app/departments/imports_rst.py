@@ -0,0 +1,48 @@
+from typing import Any
+
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel
+from sqlalchemy.orm import Session
+
+from common.database import get_db
+from departments.imports_db import OrgImporter
+
+router = APIRouter(tags=["import"], prefix="/import")
+
+
+class ErrorModel(BaseModel):
+    line: int
+    detail: str
+
+
+class ResultModel(BaseModel):
+    imported: dict[str, int]
+    failed: int
+    errors: list[ErrorModel]
+
+
+@router.post("/", response_model=ResultModel)
+async def import_org(
+        request: Request,
+        chunk_size: int = Query(5000, ge=1, le=20000),
+        db: Session = Depends(get_db),
+) -> dict[str, Any]:
+    importer: OrgImporter = OrgImporter(db)
+    lines: list[tuple[int, bytes]] = []
+    tail: bytes = b""
+    number: int = 0
+    async for chunk in request.stream():
+        *complete, tail = (tail + chunk).split(b"\n")
+        for line in complete:
+            number += 1
+            if line.strip():
+                lines.append((number, line))
+        if len(lines) >= chunk_size:
+            await run_in_threadpool(importer.load, lines)
+            lines = []
+    if tail.strip():
+        lines.append((number + 1, tail))
+    if lines:
+        await run_in_threadpool(importer.load, lines)
+    return importer.result()
@@ -0,0 +1,242 @@
+from dataclasses import dataclass
+from functools import reduce
+from operator import or_
+from threading import Lock
+from typing import Any, Iterable, Protocol
+
+from common.versions import table_versions
+
+PERMISSION_TABLES: frozenset[str] = frozenset(
+    {"employees", "roles", "permissions", "employee_roles", "role_permissions"}
+)
+
+
+@dataclass(frozen=True)
+class EffectivePermissions:
+    employee_id: int
+    roles: frozenset[int]
+    permissions: dict[str, int]
+
+    def missing(self, names: Iterable[str]) -> list[str]:
+        return [name for name in names if name not in self.permissions]
+
+
+class PermissionObserver(Protocol):
+    def invalidate_employees(self, employee_ids: Iterable[int]) -> None: ...
+
+    def invalidate_roles(self, role_ids: Iterable[int]) -> None: ...
+
+    def invalidate_permissions(self, permission_ids: Iterable[int]) -> None: ...
+
+    def clear(self) -> None: ...
+
+
+class PermissionBitmaps:
+    def __init__(self) -> None:
+        self._lock: Lock = Lock()
+        self._role_generation: int = 0
+        self._member_generation: int = 0
+        self._loaded: bool = False
+        self._bits: dict[int, int] = {}
+        self._names: dict[str, int] = {}
+        self._roles: dict[int, int] = {}
+        self._known_roles: set[int] = set()
+        self._stale_roles: set[int] = set()
+        self._members: dict[int, frozenset[int]] = {}
+
+    @property
+    def member_generation(self) -> int:
+        return self._member_generation
+
+    def stale_roles(self) -> tuple[int, set[int] | None]:
+        with self._lock:
+            return self._role_generation, set(self._stale_roles) if self._loaded else None
+
+    def load_roles(self, generation: int, role_ids: set[int] | None, rows: Iterable[Any]) -> None:
+        with self._lock:
+            if role_ids is None:
+                self._bits.clear()
+                self._names.clear()
+                self._roles.clear()
+                self._known_roles.clear()
+            else:
+                for role_id in role_ids:
+                    self._roles.pop(role_id, None)
+                self._known_roles.update(role_ids)
+            for role_id, permission_id, name in rows:
+                self._known_roles.add(role_id)
+                if permission_id is None:
+                    continue
+                bit: int | None = self._bits.get(permission_id)
+                if bit is None:
+                    bit = self._bits[permission_id] = len(self._bits)
+                    self._names[name] = permission_id
+                self._roles[role_id] = self._roles.get(role_id, 0) | 1 << bit
+            if generation == self._role_generation:
+                self._loaded = True
+                self._stale_roles.clear()
+
+    def unknown_employees(self, employee_ids: Iterable[int]) -> list[int]:
+        return [employee_id for employee_id in employee_ids if employee_id not in self._members]
+
+    def unknown_roles(self, employee_ids: Iterable[int], members: dict[int, frozenset[int]]) -> set[int]:
+        with self._lock:
+            return {
+                role_id
+                for employee_id in employee_ids
+                for role_id in members.get(employee_id, self._members.get(employee_id, frozenset()))
+                if role_id not in self._known_roles
+            }
+
+    def put_members(self, generation: int, rows: Iterable[Any]) -> dict[int, frozenset[int]]:
+        loaded: dict[int, set[int]] = {}
+        for employee_id, role_id in rows:
+            roles: set[int] = loaded.setdefault(employee_id, set())
+            if role_id is not None:
+                roles.add(role_id)
+        members: dict[int, frozenset[int]] = {employee_id: frozenset(roles) for employee_id, roles in loaded.items()}
+        with self._lock:
+            if generation == self._member_generation:
+                self._members.update(members)
+        return members
+
+    def check(
+            self,
+            checks: Iterable[tuple[int, str]],
+            members: dict[int, frozenset[int]],
+    ) -> tuple[list[bool], list[int]]:
+        masks: dict[int, int] = {}
+        unknown: list[int] = []
+        allowed: list[bool] = []
+        with self._lock:
+            for employee_id, name in checks:
+                mask: int | None = masks.get(employee_id)
+                if mask is None:
+                    roles: frozenset[int] | None = members.get(employee_id, self._members.get(employee_id))
+                    if roles is None:
+                        unknown.append(employee_id)
+                    mask = masks[employee_id] = reduce(or_, (self._roles.get(role_id, 0) for role_id in roles or ()), 0)
+                bit: int | None = self._bits.get(self._names.get(name))
+                allowed.append(bit is not None and mask >> bit & 1 == 1)
+        return allowed, unknown
+
+    def invalidate_employees(self, employee_ids: Iterable[int]) -> None:
+        with self._lock:
+            self._member_generation += 1
+            for employee_id in employee_ids:
+                self._members.pop(employee_id, None)
+
+    def invalidate_roles(self, role_ids: Iterable[int]) -> None:
+        with self._lock:
+            self._role_generation += 1
+            self._stale_roles.update(role_ids)
+
+    def invalidate_permissions(self, permission_ids: Iterable[int]) -> None:
+        with self._lock:
+            self._role_generation += 1
+            self._loaded = False
+
+    def clear(self) -> None:
+        with self._lock:
+            self._role_generation += 1
+            self._member_generation += 1
+            self._loaded = False
+            self._stale_roles.clear()
+            self._known_roles.clear()
+            self._members.clear()
+
+
+class PermissionCache:
+    def __init__(self, observers: Iterable[PermissionObserver] = ()) -> None:
+        self._lock: Lock = Lock()
+        self._generation: int = 0
+        self._entries: dict[int, EffectivePermissions] = {}
+        self._by_role: dict[int, set[int]] = {}
+        self._by_permission: dict[int, set[int]] = {}
+        self._observers: tuple[PermissionObserver, ...] = tuple(observers)
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def get(self, employee_id: int) -> EffectivePermissions | None:
+        return self._entries.get(employee_id)
+
+    def put(self, entry: EffectivePermissions, generation: int) -> None:
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._drop(entry.employee_id)
+            self._entries[entry.employee_id] = entry
+            for role_id in entry.roles:
+                self._by_role.setdefault(role_id, set()).add(entry.employee_id)
+            for permission_id in entry.permissions.values():
+                self._by_permission.setdefault(permission_id, set()).add(entry.employee_id)
+
+    def invalidate_employees(self, employee_ids: Iterable[int]) -> None:
+        employee_ids = set(employee_ids)
+        for observer in self._observers:
+            observer.invalidate_employees(employee_ids)
+        with self._lock:
+            self._generation += 1
+            for employee_id in employee_ids:
+                self._drop(employee_id)
+
+    def invalidate_roles(self, role_ids: Iterable[int]) -> None:
+        role_ids = set(role_ids)
+        for observer in self._observers:
+            observer.invalidate_roles(role_ids)
+        with self._lock:
+            self._generation += 1
+            for role_id in role_ids:
+                for employee_id in self._by_role.get(role_id, set()).copy():
+                    self._drop(employee_id)
+
+    def invalidate_permissions(self, permission_ids: Iterable[int]) -> None:
+        permission_ids = set(permission_ids)
+        for observer in self._observers:
+            observer.invalidate_permissions(permission_ids)
+        with self._lock:
+            self._generation += 1
+            for permission_id in permission_ids:
+                for employee_id in self._by_permission.get(permission_id, set()).copy():
+                    self._drop(employee_id)
+
+    def clear(self) -> None:
+        for observer in self._observers:
+            observer.clear()
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._by_role.clear()
+            self._by_permission.clear()
+
+    def _drop(self, employee_id: int) -> None:
+        entry: EffectivePermissions | None = self._entries.pop(employee_id, None)
+        if entry is None:
+            return
+        for role_id in entry.roles:
+            self._discard(self._by_role, role_id, employee_id)
+        for permission_id in entry.permissions.values():
+            self._discard(self._by_permission, permission_id, employee_id)
+
+    @staticmethod
+    def _discard(index: dict[int, set[int]], key: int, employee_id: int) -> None:
+        employees: set[int] | None = index.get(key)
+        if employees is None:
+            return
+        employees.discard(employee_id)
+        if not employees:
+            del index[key]
+
+
+permission_bitmaps = PermissionBitmaps()
+permission_cache = PermissionCache((permission_bitmaps,))
+
+
+def forget_permissions(tables: set[str]) -> None:
+    if tables & PERMISSION_TABLES:
+        permission_cache.clear()
+
+
+table_versions.subscribe(forget_permissions)
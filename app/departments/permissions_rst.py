@@ -1,8 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException
-from pydantic import BaseModel
+from typing import Any
+
+from fastapi import APIRouter, Depends, HTTPException, Response
+from pydantic import BaseModel, Field
 from sqlalchemy.orm import Session
 
-from common.database import get_db
+from common.abstracts import MAX_BULK_SIZE, Pagination
+from common.database import get_db, get_read_db
+from common.versions import conditional
 from departments.roles_db import Permission
 
 router = APIRouter(tags=["permissions"], prefix="/permissions")
@@ -19,9 +23,18 @@ class IndexModel(CreateModel):
     id: int
 
 
-@router.get("/", response_model=list[IndexModel])
-def get_permissions(db: Session = Depends(get_db)) -> list[Permission]:
-    return Permission.get_list(db)
+class BatchCheckModel(BaseModel):
+    checks: list[tuple[int, str]] = Field(min_length=1, max_length=MAX_BULK_SIZE)
+
+
+class BatchCheckResultModel(BaseModel):
+    allowed: list[bool]
+    unknown_employees: list[int]
+
+
+@router.get("/", response_model=list[IndexModel], dependencies=[Depends(conditional("permissions"))])
+def get_permissions(page: Pagination = Depends(), db: Session = Depends(get_read_db)) -> Response:
+    return page.render(Permission.get_rows(db, page, IndexModel), IndexModel)
 
 
 @router.post("/", response_model=IndexModel)
@@ -35,3 +48,9 @@ def delete_permission(permission_id: int, db: Session = Depends(get_db)) -> None
     if permission is None:
         raise HTTPException(status_code=404, detail="Permission not found")
     permission.delete(db)
+
+
+@router.post("/check/batch/", response_model=BatchCheckResultModel)
+def check_permissions_batch(check_data: BatchCheckModel, db: Session = Depends(get_read_db)) -> dict[str, Any]:
+    allowed, unknown = Permission.check_batch(db, check_data.checks)
+    return {"allowed": allowed, "unknown_employees": unknown}
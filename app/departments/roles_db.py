@@ -1,9 +1,13 @@
-from sqlalchemy import ForeignKey, String
+from typing import Any
+
+from sqlalchemy import ForeignKey, Index, Select, String, delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Mapped, mapped_column, relationship, Session, Query
 
 from common.abstracts import BaseModel
 from common.database import Base
-from departments.employees_db import EmployeeRole
+from departments.employees_db import Employee, EmployeeRole
+from departments.permissions_db import EffectivePermissions, permission_bitmaps, permission_cache
 
 
 class Permission(BaseModel):
@@ -12,6 +16,70 @@ class Permission(BaseModel):
     id: Mapped[int] = mapped_column(primary_key=True)
     name: Mapped[str] = mapped_column(String(20), unique=True)
 
+    @classmethod
+    def get_effective(cls, db: Session, employee_id: int) -> EffectivePermissions | None:
+        cached: EffectivePermissions | None = permission_cache.get(employee_id)
+        if cached is not None:
+            return cached
+        generation: int = permission_cache.generation
+        rows: list[Any] = (
+            db.query(EmployeeRole.role_id, cls.id, cls.name)
+            .select_from(Employee)
+            .outerjoin(EmployeeRole, EmployeeRole.employee_id == Employee.id)
+            .outerjoin(RolePermission, RolePermission.role_id == EmployeeRole.role_id)
+            .outerjoin(cls, cls.id == RolePermission.permission_id)
+            .filter(Employee.id == employee_id)
+            .all()
+        )
+        if not rows:
+            return None
+        effective: EffectivePermissions = EffectivePermissions(
+            employee_id=employee_id,
+            roles=frozenset(role_id for role_id, _, _ in rows if role_id is not None),
+            permissions={name: permission_id for _, permission_id, name in rows if permission_id is not None},
+        )
+        permission_cache.put(effective, generation)
+        return effective
+
+    @classmethod
+    def check_batch(cls, db: Session, checks: list[tuple[int, str]]) -> tuple[list[bool], list[int]]:
+        employee_ids: set[int] = {employee_id for employee_id, _ in checks}
+        members: dict[int, frozenset[int]] = {}
+        member_generation: int = permission_bitmaps.member_generation
+        if unknown := permission_bitmaps.unknown_employees(employee_ids):
+            members = permission_bitmaps.put_members(
+                member_generation,
+                db.execute(
+                    select(Employee.id, EmployeeRole.role_id)
+                    .outerjoin(EmployeeRole, EmployeeRole.employee_id == Employee.id)
+                    .where(Employee.id.in_(Employee.id_list(unknown)))
+                ).all(),
+            )
+
+        generation, stale = permission_bitmaps.stale_roles()
+        if stale is not None:
+            stale |= permission_bitmaps.unknown_roles(employee_ids, members)
+        if stale is None or stale:
+            stmt: Select = (
+                select(Role.id, cls.id, cls.name)
+                .outerjoin(RolePermission, RolePermission.role_id == Role.id)
+                .outerjoin(cls, cls.id == RolePermission.permission_id)
+            )
+            if stale is not None:
+                stmt = stmt.where(Role.id.in_(Role.id_list(stale)))
+            permission_bitmaps.load_roles(generation, stale, db.execute(stmt).all())
+
+        names: dict[str, str] = {name: cls.normalize_name(name) for name in {name for _, name in checks}}
+        return permission_bitmaps.check(((employee_id, names[name]) for employee_id, name in checks), members)
+
+    def delete(self, db: Session) -> None:
+        super().delete(db)
+        permission_cache.invalidate_permissions({self.id})
+
+    async def adelete(self, db: AsyncSession) -> None:
+        await super().adelete(db)
+        permission_cache.invalidate_permissions({self.id})
+
 
 class RolePermission(Base):
     __tablename__ = "role_permissions"
@@ -23,6 +91,7 @@ class RolePermission(Base):
     permission_id: Mapped[int] = mapped_column(
         ForeignKey("permissions.id", ondelete="CASCADE"),
         primary_key=True,
+        index=True,
     )
 
     @classmethod
@@ -31,6 +100,7 @@ class RolePermission(Base):
             cls(role_id=role_id, permission_id=permission) for permission in permissions
         )
         db.commit()
+        permission_cache.invalidate_roles({role_id})
 
     @classmethod
     def delete_by_ids(cls, db: Session, role_id: int, permissions: set[int]) -> None:
@@ -40,6 +110,7 @@ class RolePermission(Base):
         )
         stmt.delete()
         db.commit()
+        permission_cache.invalidate_roles({role_id})
 
     @classmethod
     def update_permissions(
@@ -52,12 +123,40 @@ class RolePermission(Base):
         cls.delete_by_ids(db, role_id, db_data - new_data)
         cls.create_bulk(db, role_id, list(new_data - db_data))
 
+    @classmethod
+    async def acreate_bulk(cls, db: AsyncSession, role_id: int, permissions: list[int]) -> None:
+        db.add_all(
+            cls(role_id=role_id, permission_id=permission) for permission in permissions
+        )
+        await db.commit()
+        permission_cache.invalidate_roles({role_id})
+
+    @classmethod
+    async def adelete_by_ids(cls, db: AsyncSession, role_id: int, permissions: set[int]) -> None:
+        await db.execute(delete(cls).where(cls.role_id == role_id, cls.permission_id.in_(permissions)))
+        await db.commit()
+        permission_cache.invalidate_roles({role_id})
+
+    @classmethod
+    async def aupdate_permissions(
+            cls,
+            db: AsyncSession,
+            role_id: int,
+            new_data: set[int],
+            db_data: set[int],
+    ) -> None:
+        await cls.adelete_by_ids(db, role_id, db_data - new_data)
+        await cls.acreate_bulk(db, role_id, list(new_data - db_data))
+
 
 class Role(BaseModel):
     __tablename__ = "roles"
+    __table_args__ = (
+        Index("ix_roles_department_id_name", "department_id", "name", unique=True),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
-    name: Mapped[str] = mapped_column(String(30))
+    name: Mapped[str] = mapped_column(String(30), index=True)
 
     department_id: Mapped[int] = mapped_column(
         ForeignKey("departments.id", ondelete="CASCADE"),
@@ -66,3 +165,11 @@ class Role(BaseModel):
     permissions = relationship("Permission", secondary=RolePermission.__table__)
 
     employees = relationship("Employee", secondary=EmployeeRole.__table__, back_populates="roles")
+
+    def delete(self, db: Session) -> None:
+        super().delete(db)
+        permission_cache.invalidate_roles({self.id})
+
+    async def adelete(self, db: AsyncSession) -> None:
+        await super().adelete(db)
+        permission_cache.invalidate_roles({self.id})
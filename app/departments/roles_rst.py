@@ -1,11 +1,14 @@
-from typing import Any
+from typing import Any, ClassVar
 
-from fastapi import APIRouter, Depends, HTTPException
-from pydantic import BaseModel
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Response
+from pydantic import BaseModel, Field
+from sqlalchemy.orm import Session, selectinload
 
-from common.database import get_db
+from common.abstracts import MAX_BULK_SIZE, Pagination
+from common.database import get_db, get_read_db
+from common.versions import conditional
 from departments.departments_db import Department
+from departments.employees_db import Employee, EmployeeRole
 from departments.roles_db import Role, Permission, RolePermission
 
 router = APIRouter(tags=["roles"], prefix="/departments/{department_id}/roles")
@@ -34,65 +37,125 @@ class UpdateModel(CreateModel):
     name: str | None = None
 
 
+class EmployeeIdsModel(BaseModel):
+    employee_ids: list[int] = Field(min_length=1, max_length=MAX_BULK_SIZE)
+
+
+class BulkResultModel(BaseModel):
+    updated: int
+    missing: list[int]
+
+
 class FullModel(ListModel):
+    loaders: ClassVar[dict] = {"permissions": selectinload}
+
     permissions: list[ListModel]
 
 
-@router.get("/", response_model=list[ListModel])
-def get_roles(department_id: int, db: Session = Depends(get_db)):
-    if Department.find_by_id(db, department_id) is None:
+@router.get(
+    "/",
+    response_model=list[ListModel],
+    dependencies=[Depends(conditional("departments", "roles"))],
+)
+def get_roles(department_id: int, page: Pagination = Depends(), db: Session = Depends(get_read_db)) -> Response:
+    if not Department.exists(db, department_id):
         raise HTTPException(status_code=404, detail="Department not found")
-    return Role.get_list(db, department_id=department_id)
+    return page.render(Role.get_rows(db, page, ListModel, department_id=department_id), ListModel)
 
 
 @router.post("/", response_model=FullModel)
 def create_role(department_id: int, create_data: CreateModel, db: Session = Depends(get_db)) -> Role:
-    if Department.find_by_id(db, department_id) is None:
+    if not Department.exists(db, department_id):
         raise HTTPException(status_code=404, detail="Department not found")
     new_role: Role = Role.get_or_create(db, name=create_data.name, department_id=department_id)
     if create_data.permissions is not None:
-        new_permissions: list[int] = [
-            Permission.get_or_create(db, name=permission).id for permission in set(create_data.permissions)
-        ]
-        RolePermission.create_bulk(db, new_role.id, new_permissions)
+        new_permissions: dict[str, int] = Permission.get_or_create_many(db, create_data.permissions)
+        RolePermission.create_bulk(db, new_role.id, list(new_permissions.values()))
     return new_role
 
 
-@router.get("/{role_id}/", response_model=FullModel)
-def get_role(department_id: int, role_id: int, db: Session = Depends(get_db)) -> Role:
-    if Department.find_by_id(db, department_id) is None:
+@router.get(
+    "/{role_id}/",
+    response_model=FullModel,
+    dependencies=[Depends(conditional("departments", "roles", "role_permissions", "permissions"))],
+)
+def get_role(department_id: int, role_id: int, db: Session = Depends(get_read_db)) -> Role:
+    if not Department.exists(db, department_id):
         raise HTTPException(status_code=404, detail="Department not found")
-    role: Role = Role.find_by_id(db, role_id)
+    role: Role = Role.find_by_id(db, role_id, FullModel)
     if role is None:
         raise HTTPException(status_code=404, detail="Role not found")
     return role
 
 
+def check_role_name(role: Role, existing: Role | None) -> None:
+    if existing is not None and existing.id != role.id:
+        raise HTTPException(status_code=409, detail="Role already exists")
+
+
 @router.patch("/{role_id}/", response_model=FullModel)
 def update_role(department_id: int, role_id: int, update_data: UpdateModel, db: Session = Depends(get_db)) -> Role:
-    if Department.find_by_id(db, department_id) is None:
+    if not Department.exists(db, department_id):
         raise HTTPException(status_code=404, detail="Department not found")
     role: Role = Role.find_by_id(db, role_id)
     if role is None:
         raise HTTPException(status_code=404, detail="Role not found")
     update_data: dict[str, Any] = update_data.model_dump(exclude_none=True)
     for key, value in update_data.items():
+        if key == "name":
+            value = Role.normalize_name(value)
+            check_role_name(role, Role.get_first(db, name=value, department_id=role.department_id))
         if key != "permissions":
             setattr(role, key, value)
             continue
-        received_permissions: set[int] = {
-            Permission.get_or_create(db, name=permission).id for permission in value
-        }
+        received_permissions: set[int] = set(Permission.get_or_create_many(db, value).values())
         permissions_from_db: set[int] = {permission.id for permission in role.permissions}
         RolePermission.update_permissions(db, role.id, received_permissions, permissions_from_db)
+    db.commit()
     return role
 
 
 @router.delete("/{role_id}/")
 def delete_role(department_id: int, role_id: int, db: Session = Depends(get_db)) -> None:
-    if Department.find_by_id(db, department_id) is None:
+    if not Department.exists(db, department_id):
         raise HTTPException(status_code=404, detail="Department not found")
     role: Role = Role.find_by_id(db, role_id)
     if role is None:
         raise HTTPException(status_code=404, detail="Role not found")
     role.delete(db)
+
+
+def find_department_role(db: Session, department_id: int, role_id: int) -> None:
+    if not Department.exists(db, department_id):
+        raise HTTPException(status_code=404, detail="Department not found")
+    role: Any = Role.get_snapshot(db, id=role_id)
+    if role is None or role.department_id != department_id:
+        raise HTTPException(status_code=404, detail="Role not found")
+
+
+@router.post("/{role_id}/employees/assign/", response_model=BulkResultModel)
+def assign_role(
+        department_id: int,
+        role_id: int,
+        bulk_data: EmployeeIdsModel,
+        db: Session = Depends(get_db),
+) -> dict[str, Any]:
+    find_department_role(db, department_id, role_id)
+    return {
+        "missing": Employee.missing_ids(db, bulk_data.employee_ids),
+        "updated": EmployeeRole.assign_bulk(db, role_id, bulk_data.employee_ids),
+    }
+
+
+@router.post("/{role_id}/employees/revoke/", response_model=BulkResultModel)
+def revoke_role(
+        department_id: int,
+        role_id: int,
+        bulk_data: EmployeeIdsModel,
+        db: Session = Depends(get_db),
+) -> dict[str, Any]:
+    find_department_role(db, department_id, role_id)
+    return {
+        "missing": Employee.missing_ids(db, bulk_data.employee_ids),
+        "updated": EmployeeRole.revoke_bulk(db, role_id, bulk_data.employee_ids),
+    }
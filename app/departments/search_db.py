@@ -0,0 +1,81 @@
+from re import compile, Pattern
+from typing import Any, Iterable
+
+from sqlalchemy import Connection, MetaData, event, text
+from sqlalchemy.orm import Session
+
+from common.database import Base
+
+TOKENS: Pattern = compile(r"\w+")
+
+SEARCH_TABLES: dict[str, tuple[str, tuple[str, ...]]] = {
+    "employee": ("employees", ("name", "surname")),
+    "department": ("departments", ("name",)),
+    "role": ("roles", ("name",)),
+}
+
+
+def search_ddl(table: str, columns: tuple[str, ...]) -> list[str]:
+    index: str = f"{table}_fts"
+    names: str = ", ".join(columns)
+    new: str = ", ".join(f"new.{column}" for column in columns)
+    old: str = ", ".join(f"old.{column}" for column in columns)
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {index} USING fts5({names}, content='{table}', content_rowid='id', "
+        f"tokenize='unicode61 remove_diacritics 2', prefix='1 2 3')",
+        f"CREATE TRIGGER IF NOT EXISTS {index}_insert AFTER INSERT ON {table} BEGIN "
+        f"INSERT INTO {index}(rowid, {names}) VALUES (new.id, {new}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {index}_delete AFTER DELETE ON {table} BEGIN "
+        f"INSERT INTO {index}({index}, rowid, {names}) VALUES ('delete', old.id, {old}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {index}_update AFTER UPDATE OF {names} ON {table} BEGIN "
+        f"INSERT INTO {index}({index}, rowid, {names}) VALUES ('delete', old.id, {old}); "
+        f"INSERT INTO {index}(rowid, {names}) VALUES (new.id, {new}); END",
+    ]
+
+
+def create_search_index(connection: Connection, rebuild: bool = True) -> None:
+    for table, columns in SEARCH_TABLES.values():
+        exists: bool = connection.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {"name": f"{table}_fts"}
+        ).first() is not None
+        for statement in search_ddl(table, columns):
+            connection.execute(text(statement))
+        if rebuild or not exists:
+            connection.execute(text(f"INSERT INTO {table}_fts({table}_fts) VALUES ('rebuild')"))
+
+
+@event.listens_for(Base.metadata, "after_create")
+def create_search_tables(metadata: MetaData, connection: Connection, **kwargs) -> None:
+    create_search_index(connection, rebuild=False)
+
+
+@event.listens_for(Base.metadata, "before_drop")
+def drop_search_tables(metadata: MetaData, connection: Connection, **kwargs) -> None:
+    for table, _ in SEARCH_TABLES.values():
+        for trigger in ("insert", "delete", "update"):
+            connection.execute(text(f"DROP TRIGGER IF EXISTS {table}_fts_{trigger}"))
+        connection.execute(text(f"DROP TABLE IF EXISTS {table}_fts"))
+
+
+def match_expression(query: str) -> str | None:
+    return " ".join(f'"{token}"*' for token in TOKENS.findall(query.lower())) or None
+
+
+def search(db: Session, query: str, kinds: Iterable[str], limit: int, offset: int) -> list[Any]:
+    expression: str | None = match_expression(query)
+    if expression is None:
+        return []
+    selects: list[str] = []
+    for kind in kinds:
+        table, columns = SEARCH_TABLES[kind]
+        title: str = " || ' ' || ".join(columns)
+        selects.append(
+            f"SELECT '{kind}' AS kind, rowid AS id, {title} AS title, "
+            f"bm25({table}_fts) AS rank FROM {table}_fts WHERE {table}_fts MATCH :expression"
+        )
+    return list(
+        db.execute(
+            text(f"{' UNION ALL '.join(selects)} ORDER BY rank, kind, id LIMIT :limit OFFSET :offset"),
+            {"expression": expression, "limit": limit, "offset": offset},
+        ).mappings()
+    )
@@ -0,0 +1,41 @@
+from enum import Enum
+from typing import Any
+
+from fastapi import APIRouter, Depends, Query
+from pydantic import BaseModel
+from sqlalchemy.orm import Session
+
+from common.abstracts import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from common.database import get_read_db
+from common.versions import conditional
+from departments.search_db import search
+
+router = APIRouter(tags=["search"], prefix="/search")
+
+
+class SearchKind(str, Enum):
+    employee = "employee"
+    department = "department"
+    role = "role"
+
+
+class ResultModel(BaseModel):
+    kind: SearchKind
+    id: int
+    title: str
+    rank: float
+
+
+@router.get(
+    "/",
+    response_model=list[ResultModel],
+    dependencies=[Depends(conditional("departments", "employees", "roles"))],
+)
+def search_org(
+        q: str = Query(min_length=1, max_length=100),
+        kind: list[SearchKind] = Query(list(SearchKind)),
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+        offset: int = Query(0, ge=0),
+        db: Session = Depends(get_read_db),
+) -> list[Any]:
+    return search(db, q, [item.value for item in dict.fromkeys(kind)], limit, offset)
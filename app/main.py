@@ -1,21 +1,80 @@
-from fastapi import FastAPI
+from logging import getLogger
+
+from fastapi import FastAPI, APIRouter
+from fastapi.responses import ORJSONResponse
+from fastapi.routing import APIRoute
 from uvicorn import run
 
-from common.database import Base, engine
+from common.debug_rst import router as debug_router
+from common.database import Base, engine, DATABASE_MODE
+from common.metrics import MetricsMiddleware
+from common.metrics_rst import router as metrics_router
+from common.migrations import migrate, missing_indexes
+from common.settings import settings
+from common.versions import CoherenceMiddleware, NotModified, not_modified_handler
+from departments import async_rst
 from departments.departments_rst import router as department_router
 from departments.employees_rst import router as employee_router
 from departments.roles_rst import router as role_router
 from departments.permissions_rst import router as permission_router
+from departments.batch_rst import router as batch_router
+from departments.imports_rst import router as import_router
+from departments.exports_rst import router as export_router
+from departments.search_rst import router as search_router
+from departments.changes_rst import router as changes_router
+
+
+def prepare_database() -> None:
+    Base.metadata.create_all(bind=engine)
+    migrate(engine)
+    for index_name in missing_indexes(engine):
+        getLogger(__name__).warning("Missing index %s", index_name)
+
+
+prepare_database()
+
+
+def include_missing(app: FastAPI, router: APIRouter) -> None:
+    served: set[tuple[str, str]] = {
+        (route.path, method) for route in app.routes if isinstance(route, APIRoute) for method in route.methods
+    }
+    app.include_router(
+        APIRouter(routes=[
+            route for route in router.routes
+            if not any((route.path, method) in served for method in route.methods)
+        ])
+    )
+
+
+def create_app(database_mode: str = DATABASE_MODE, debug: bool = settings.debug_endpoints) -> FastAPI:
+    new_app: FastAPI = FastAPI(default_response_class=ORJSONResponse)
+    new_app.add_exception_handler(NotModified, not_modified_handler)
+    new_app.add_middleware(CoherenceMiddleware)
+    new_app.add_middleware(MetricsMiddleware)
+
+    if database_mode == "async":
+        new_app.include_router(async_rst.department_router)
+        new_app.include_router(async_rst.employee_router)
+        new_app.include_router(async_rst.role_router)
+        new_app.include_router(async_rst.permission_router)
 
-Base.metadata.create_all(bind=engine)
+    include_missing(new_app, department_router)
+    include_missing(new_app, employee_router)
+    include_missing(new_app, role_router)
+    include_missing(new_app, permission_router)
+    new_app.include_router(batch_router)
+    new_app.include_router(import_router)
+    new_app.include_router(export_router)
+    new_app.include_router(search_router)
+    new_app.include_router(changes_router)
+    if debug:
+        new_app.include_router(debug_router)
+    new_app.include_router(metrics_router)
+    return new_app
 
-app = FastAPI()
 
-app.include_router(department_router)
-app.include_router(employee_router)
-app.include_router(role_router)
-app.include_router(permission_router)
+app = create_app()
 
 
 if __name__ == "__main__":
-    run("main:app", host="0.0.0.0", port=8000, reload=True)
+    run("main:app", host=settings.host, port=settings.port, reload=settings.reload)
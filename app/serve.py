@@ -0,0 +1,68 @@
+from logging import getLogger, Logger
+from multiprocessing.context import SpawnProcess
+from signal import SIGHUP, signal
+from socket import socket
+from threading import Event
+from typing import Callable
+
+from uvicorn import Config, Server
+from uvicorn._subprocess import get_subprocess
+from uvicorn.supervisors import Multiprocess
+
+from common.settings import settings
+from main import prepare_database
+
+logger: Logger = getLogger("uvicorn.error")
+
+
+class Supervisor(Multiprocess):
+    def __init__(self, config: Config, target: Callable[..., None], sockets: list[socket]) -> None:
+        super().__init__(config, target, sockets)
+        self.should_restart: Event = Event()
+
+    def startup(self) -> None:
+        super().startup()
+        signal(SIGHUP, lambda sig, frame: self.should_restart.set())
+
+    def run(self) -> None:
+        self.startup()
+        while not self.should_exit.wait(1):
+            if self.should_restart.is_set():
+                self.should_restart.clear()
+                self.restart()
+            self.replace_exited()
+        self.shutdown()
+
+    def spawn(self) -> SpawnProcess:
+        process: SpawnProcess = get_subprocess(config=self.config, target=self.target, sockets=self.sockets)
+        process.start()
+        return process
+
+    def restart(self) -> None:
+        logger.info("Restarting %d workers", len(self.processes))
+        for index, process in enumerate(list(self.processes)):
+            self.processes[index] = self.spawn()
+            process.terminate()
+            process.join()
+
+    def replace_exited(self) -> None:
+        for index, process in enumerate(self.processes):
+            if not process.is_alive():
+                logger.warning("Worker %s exited with code %s, starting a new one", process.pid, process.exitcode)
+                self.processes[index] = self.spawn()
+
+
+def main() -> None:
+    prepare_database()
+    config: Config = Config(
+        "main:app",
+        host=settings.host,
+        port=settings.port,
+        workers=settings.workers,
+        timeout_graceful_shutdown=settings.graceful_timeout,
+    )
+    Supervisor(config, Server(config).run, [config.bind_socket()]).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+from typing import Any
+
+from fastapi.testclient import TestClient
+from werkzeug.test import Response
+
+
+def test_async_departments(async_client: TestClient):
+    root: dict[str, Any] = async_client.post("/departments/", json={"name": "root"}).json()
+    child: dict[str, Any] = async_client.post("/departments/", json={"name": "child", "parent_id": root["id"]}).json()
+    assert child == {"id": 2, "name": "child", "parent_id": root["id"]}
+
+    department: Response = async_client.get(f"/departments/{root['id']}/")
+    assert department.status_code == 200
+    assert department.json()["children"] == [{"id": child["id"], "name": "child"}]
+
+    updated: Response = async_client.patch(f"/departments/{child['id']}/", json={"name": "renamed"})
+    assert updated.json() == {"id": child["id"], "name": "renamed", "parent_id": None, "children": [], "employees": []}
+
+    assert async_client.delete(f"/departments/{child['id']}/").status_code == 200
+    assert [row["id"] for row in async_client.get("/departments/").json()] == [root["id"]]
+    assert async_client.get("/departments/99/").json() == {"detail": "Department not found"}
+
+
+def test_async_employees_and_roles(async_client: TestClient, test_department: int):
+    employee: Response = async_client.post(
+        "/employees/",
+        json={"name": "John", "surname": "Doe", "department_id": test_department, "roles": [{"name": "test_role"}]},
+    )
+    assert employee.status_code == 200
+    assert employee.json()["roles"] == [{"name": "test-role"}]
+
+    role: Response = async_client.patch(
+        f"/departments/{test_department}/roles/1/", json={"permissions": ["toilet", "hall"]}
+    )
+    assert role.json()["permissions"] == [{"id": 1, "name": "toilet"}, {"id": 2, "name": "hall"}]
+
+    permissions: Response = async_client.get(f"/employees/{employee.json()['id']}/permissions/")
+    assert [permission["name"] for permission in permissions.json()["permissions"]] == ["toilet", "hall"]
+
+    updated: Response = async_client.patch(
+        f"/employees/{employee.json()['id']}/",
+        json={"name": "Jack", "surname": "Doe", "department_id": test_department, "roles": []},
+    )
+    assert updated.json()["name"] == "Jack"
+    assert updated.json()["roles"] == []
+
+    assert async_client.delete(f"/employees/{employee.json()['id']}/").status_code == 200
+    assert async_client.get("/employees/").json() == []
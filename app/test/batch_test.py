@@ -0,0 +1,71 @@
+from typing import Any
+
+from fastapi.testclient import TestClient
+from pytest import MonkeyPatch
+from werkzeug.test import Response
+
+from departments import roles_rst
+
+OPERATIONS: list[dict[str, Any]] = [
+    {"method": "POST", "path": "/departments/", "ref": "department", "body": {"name": "sales"}},
+    {"method": "POST", "path": "/permissions/", "body": {"name": "coffee_machine"}},
+    {
+        "method": "POST",
+        "path": "/departments/$ref:department/roles/",
+        "ref": "manager",
+        "body": {"name": "Manager", "permissions": ["coffee-machine", "printer"]},
+    },
+    {
+        "method": "POST",
+        "path": "/employees/",
+        "ref": "john",
+        "body": {"name": "John", "surname": "Doe", "department_id": "$ref:department", "roles": [{"name": "manager"}]},
+    },
+    {"method": "PATCH", "path": "/departments/$ref:department/roles/$ref:manager/", "body": {"name": "head"}},
+]
+
+
+def test_batch(client: TestClient):
+    result: Response = client.post("/batch/", json={"operations": OPERATIONS})
+    assert result.status_code == 200
+    bodies: list[Any] = [operation["body"] for operation in result.json()]
+    assert bodies[0] == {"id": 1, "name": "sales", "parent_id": None}
+    assert bodies[2]["permissions"] == [{"id": 1, "name": "coffee-machine"}, {"id": 2, "name": "printer"}]
+    assert bodies[4]["name"] == "head"
+
+    permissions: Response = client.get(f"/employees/{bodies[3]['id']}/permissions/")
+    assert [permission["name"] for permission in permissions.json()["permissions"]] == ["coffee-machine", "printer"]
+
+
+def test_batch_rolls_back(client: TestClient):
+    result: Response = client.post("/batch/", json={"operations": [
+        OPERATIONS[0],
+        {"method": "POST", "path": "/departments/$ref:department/roles/", "body": {"name": "manager"}},
+        {"method": "DELETE", "path": "/employees/99/"},
+    ]})
+    assert result.status_code == 404
+    assert result.json() == {"detail": {"operation": 2, "detail": "Employee not found"}}
+    assert client.get("/departments/").json() == []
+
+    result = client.post(
+        "/batch/", json={"operations": [{"method": "POST", "path": "/departments/$ref:missing/roles/"}]}
+    )
+    assert result.status_code == 422
+    assert result.json() == {"detail": {"operation": 0, "detail": "Unknown reference: missing"}}
+
+
+def test_batch_reports_database_errors(client: TestClient, monkeypatch: MonkeyPatch):
+    result: Response = client.post("/batch/", json={"operations": [
+        OPERATIONS[0],
+        {"method": "POST", "path": "/departments/$ref:department/roles/", "body": {"name": "$money"}},
+    ]})
+    assert result.json()[1]["body"]["name"] == "$money"
+
+    monkeypatch.setattr(roles_rst, "check_role_name", lambda role, existing: None)
+    result = client.post("/batch/", json={"operations": [
+        {"method": "POST", "path": "/departments/1/roles/", "ref": "role", "body": {"name": "cashier"}},
+        {"method": "PATCH", "path": "/departments/1/roles/$ref:role/", "body": {"name": "$money"}},
+    ]})
+    assert result.status_code == 409
+    assert result.json() == {"detail": {"operation": 1, "detail": "Database error: IntegrityError"}}
+    assert [role["name"] for role in client.get("/departments/1/roles/").json()] == ["$money"]
@@ -0,0 +1,16 @@
+from typing import Any
+
+from benchmarks.generator import OrgShape
+from benchmarks.run import run_benchmark
+
+
+def test_benchmark_covers_every_route(tmp_path):
+    shape: OrgShape = OrgShape(employees=20, depth=3, fan_out=2, roles_per_department=2, permissions=5)
+    report: dict[str, Any] = run_benchmark(shape, tmp_path / "benchmark.db", iterations=2)
+
+    assert report["rows"]["departments"] == 7
+    assert report["rows"]["employees"] == 20
+    assert report["rows"]["employee_roles"] == 40
+    assert report["uncovered"] == []
+    for result in report["results"]:
+        assert all(status < 400 for status in result["statuses"]), result
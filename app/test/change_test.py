@@ -0,0 +1,66 @@
+from typing import Any
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+from werkzeug.test import Response
+
+from departments.departments_db import Department
+
+
+def changes(client: TestClient, **params: Any) -> list[tuple[str, int, int | None, str]]:
+    result: Response = client.get("/changes/", params=params)
+    assert result.status_code == 200
+    return [(row["entity"], row["entity_id"], row["related_id"], row["operation"]) for row in result.json()]
+
+
+def test_change_feed(client: TestClient, session: Session):
+    source: int = client.post("/departments/", json={"name": "source"}).json()["id"]
+    target: int = client.post("/departments/", json={"name": "target"}).json()["id"]
+    role: int = client.post(
+        f"/departments/{source}/roles/", json={"name": "cook", "permissions": ["kitchen"]}
+    ).json()["id"]
+    employee: int = client.post(
+        "/employees/",
+        json={"name": "John", "surname": "Doe", "department_id": source, "roles": [{"name": "cook"}]},
+    ).json()["id"]
+    assert changes(client) == [
+        ("departments", source, None, "insert"),
+        ("departments", target, None, "insert"),
+        ("roles", role, None, "insert"),
+        ("permissions", 1, None, "insert"),
+        ("role_permissions", role, 1, "insert"),
+        ("employees", employee, None, "insert"),
+        ("employee_roles", employee, role, "insert"),
+    ]
+
+    client.post(f"/departments/{target}/employees/move/", json={"employee_ids": [employee], "keep_roles": False})
+    client.delete(f"/departments/{source}/subtree/")
+    assert changes(client, since=7) == [
+        ("employees", employee, None, "update"),
+        ("employee_roles", employee, role, "delete"),
+        ("roles", role, None, "delete"),
+        ("role_permissions", role, 1, "delete"),
+        ("departments", source, None, "delete"),
+    ]
+
+    first: Response = client.get("/changes/", params={"since": 2, "limit": 3})
+    assert [row["seq"] for row in first.json()] == [3, 4, 5]
+    rest: Response = client.get("/changes/", params={"since": first.headers["X-Next-Cursor"]})
+    assert [row["seq"] for row in rest.json()] == [6, 7, 8, 9, 10, 11, 12]
+
+    session.add(Department(name="rolled back"))
+    session.flush()
+    session.rollback()
+
+    assert client.post("/changes/compact/", json={"through": 5}).json() == {"removed": 3}
+    assert client.post("/changes/compact/", json={}).json() == {"removed": 2}
+    assert changes(client) == [
+        ("departments", target, None, "insert"),
+        ("permissions", 1, None, "insert"),
+        ("employees", employee, None, "update"),
+        ("employee_roles", employee, role, "delete"),
+        ("roles", role, None, "delete"),
+        ("role_permissions", role, 1, "delete"),
+        ("departments", source, None, "delete"),
+    ]
+    assert changes(client, since=12) == []
@@ -1,28 +1,40 @@
-from typing import Any, Callable
+from contextlib import contextmanager
+from typing import Any, Callable, ContextManager
 
 from pytest import fixture
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.pool import NullPool
 
 from departments.departments_db import Department
 from departments.employees_db import Employee
+from departments.permissions_db import permission_cache
 from departments.roles_db import Role
-from main import app
+from main import create_app
 from common.abstracts import BaseModel
-from common.database import get_db, Base
+from common.cache import identity_cache
+from common.database import get_db, get_read_db, get_async_db, Base
 
 SQLALCHEMY_DATABASE_URL = "sqlite:///./instance/test.db"
+ASYNC_SQLALCHEMY_DATABASE_URL = "sqlite+aiosqlite:///./instance/test.db"
+
+app = create_app(debug=True)
 
 engine = create_engine(SQLALCHEMY_DATABASE_URL)
+async_engine = create_async_engine(ASYNC_SQLALCHEMY_DATABASE_URL, poolclass=NullPool)
 
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+AsyncTestingSessionLocal = async_sessionmaker(autoflush=False, expire_on_commit=False, bind=async_engine)
 
 
 @fixture
 def session():
     Base.metadata.drop_all(bind=engine)
     Base.metadata.create_all(bind=engine)
+    permission_cache.clear()
+    identity_cache.clear()
 
     db = TestingSessionLocal()
     try:
@@ -31,6 +43,25 @@ def session():
         db.close()
 
 
+@fixture
+def max_queries() -> Callable[[int], ContextManager[list[str]]]:
+    @contextmanager
+    def max_queries_inner(limit: int):
+        statements: list[str] = []
+
+        def count(conn, cursor, statement, parameters, context, executemany) -> None:
+            statements.append(statement)
+
+        event.listen(engine, "before_cursor_execute", count)
+        try:
+            yield statements
+        finally:
+            event.remove(engine, "before_cursor_execute", count)
+        assert len(statements) <= limit, statements
+
+    return max_queries_inner
+
+
 @fixture
 def client(session):
     def override_get_db():
@@ -39,9 +70,26 @@ def client(session):
         finally:
             session.close()
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
     yield TestClient(app)
 
 
+@fixture
+def async_client(session):
+    async_app = create_app("async", debug=True)
+
+    def override_get_db():
+        yield session
+
+    async def override_get_async_db():
+        async with AsyncTestingSessionLocal() as db:
+            yield db
+    async_app.dependency_overrides[get_db] = override_get_db
+    async_app.dependency_overrides[get_read_db] = override_get_db
+    async_app.dependency_overrides[get_async_db] = override_get_async_db
+    yield TestClient(async_app)
+
+
 def delete_by_id(session: Session, entry_id: int, table: type[BaseModel]) -> None:
     row = table.find_by_id(session, entry_id)
     row.delete(session)
@@ -0,0 +1,130 @@
+from sqlite3 import connect
+
+from fastapi.testclient import TestClient
+from pytest import raises
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+from werkzeug.test import Response
+
+from common.cache import MISSING, identity_cache
+from common.database import Base, engine, read_engine
+from common.migrations import MIGRATIONS, migrate, missing_indexes
+from common.settings import settings
+from common.versions import ChangeWatcher
+from departments.departments_db import Department
+from departments.permissions_db import permission_cache
+
+
+def test_engine_profile():
+    with engine.connect() as connection:
+        assert connection.execute(text("PRAGMA journal_mode")).scalar() == settings.journal_mode.lower()
+        assert connection.execute(text("PRAGMA busy_timeout")).scalar() == settings.busy_timeout
+
+    with read_engine.connect() as connection:
+        assert connection.execute(text("SELECT count(*) FROM departments")).scalar() >= 0
+        with raises(OperationalError):
+            connection.execute(text("DELETE FROM departments"))
+
+
+def test_migrate_legacy_database(tmp_path):
+    legacy_engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    with legacy_engine.begin() as connection:
+        for statement in (
+            "CREATE TABLE departments (id INTEGER PRIMARY KEY, name VARCHAR(100), parent_id INTEGER)",
+            "CREATE TABLE employees (id INTEGER PRIMARY KEY, name VARCHAR(20), surname VARCHAR(20), department_id INT)",
+            "CREATE TABLE permissions (id INTEGER PRIMARY KEY, name VARCHAR(20) UNIQUE)",
+            "CREATE TABLE roles (id INTEGER PRIMARY KEY, name VARCHAR(30), department_id INTEGER)",
+            "CREATE TABLE employee_roles (employee_id INTEGER, role_id INTEGER, PRIMARY KEY (employee_id, role_id))",
+            "CREATE TABLE role_permissions (role_id INT, permission_id INT, PRIMARY KEY (role_id, permission_id))",
+            "INSERT INTO permissions VALUES (1, 'coffee_machine'), (2, 'coffee-machine')",
+            "INSERT INTO roles VALUES (1, 'Admin', 1), (2, 'admin', 1), (3, 'admin', 2)",
+            "INSERT INTO role_permissions VALUES (1, 1), (1, 2), (2, 2)",
+            "INSERT INTO employee_roles VALUES (1, 2)",
+        ):
+            connection.execute(text(statement))
+    assert "ix_employees_department_id" in missing_indexes(legacy_engine)
+
+    Base.metadata.create_all(bind=legacy_engine)
+    assert migrate(legacy_engine) == len(MIGRATIONS)
+    assert migrate(legacy_engine) == len(MIGRATIONS)
+    assert missing_indexes(legacy_engine) == []
+
+    with legacy_engine.connect() as connection:
+        assert connection.execute(text("SELECT id, name FROM permissions")).all() == [(1, "coffee-machine")]
+        assert connection.execute(text("SELECT id, name FROM roles ORDER BY id")).all() == [(1, "admin"), (3, "admin")]
+        assert connection.execute(text("SELECT * FROM role_permissions")).all() == [(1, 1)]
+        assert connection.execute(text("SELECT * FROM employee_roles")).all() == [(1, 1)]
+        assert connection.execute(
+            text("SELECT rowid FROM roles_fts WHERE roles_fts MATCH 'adm*'")
+        ).all() == [(1,), (3,)]
+        assert connection.execute(text("SELECT count(*) FROM change_counters WHERE name = ''")).scalar() == 1
+        assert {("permissions", 2), ("roles", 2)} <= set(
+            connection.execute(text("SELECT entity, entity_id FROM changes WHERE operation = 'delete'")).all()
+        )
+
+
+def test_cross_worker_coherence(client: TestClient, session: Session, test_department: int, test_employee: int):
+    watcher: ChangeWatcher = ChangeWatcher("./instance/test.db")
+    watcher.poll()
+    etag: str = client.get("/departments/").headers["ETag"]
+    assert client.get(f"/departments/{test_department}/roles/").status_code == 200
+    assert identity_cache.get("departments", "id", test_department) is not MISSING
+    assert client.get(f"/employees/{test_employee}/permissions/").status_code == 200
+    assert permission_cache.get(test_employee) is not None
+
+    watcher.poll()
+    assert identity_cache.get("departments", "id", test_department) is not MISSING
+
+    with connect("./instance/test.db") as other_worker:
+        other_worker.execute("UPDATE departments SET name = 'renamed' WHERE id = ?", (test_department,))
+        other_worker.execute("UPDATE employees SET name = 'renamed' WHERE id = ?", (test_employee,))
+        other_worker.execute(
+            "INSERT INTO change_counters VALUES ('departments', 1), ('employees', 1) "
+            "ON CONFLICT (name) DO UPDATE SET version = version + 1"
+        )
+    watcher.poll()
+    watcher.close()
+
+    assert identity_cache.get("departments", "id", test_department) is MISSING
+    assert permission_cache.get(test_employee) is None
+    assert client.get("/departments/", headers={"If-None-Match": etag}).status_code == 200
+    assert Department.get_snapshot(session, id=test_department).name == "renamed"
+
+
+def test_local_commit_after_remote_change(client: TestClient, test_department: int):
+    role: int = client.post(
+        f"/departments/{test_department}/roles/", json={"name": "cook", "permissions": ["kitchen"]}
+    ).json()["id"]
+    employee: int = client.post(
+        "/employees/",
+        json={"name": "Anna", "surname": "Doe", "department_id": test_department, "roles": [{"name": "cook"}]},
+    ).json()["id"]
+    watcher: ChangeWatcher = ChangeWatcher("./instance/test.db")
+    watcher.poll()
+
+    def allowed() -> bool:
+        result: Response = client.post(f"/employees/{employee}/permissions/check/", json={"permissions": ["kitchen"]})
+        return result.json()["allowed"]
+
+    assert allowed() is True
+    with connect("./instance/test.db") as other_worker:
+        other_worker.execute("DELETE FROM role_permissions WHERE role_id = ?", (role,))
+        other_worker.execute("UPDATE change_counters SET version = version + 1 WHERE name = 'role_permissions'")
+    client.post(f"/departments/{test_department}/roles/", json={"name": "guard", "permissions": ["door"]})
+    watcher.poll()
+    watcher.close()
+
+    assert allowed() is False
+
+
+def test_snapshot_read_through_race(session: Session, test_department: int):
+    def concurrent_commit(*args) -> None:
+        identity_cache.invalidate("departments", [("id", test_department)])
+
+    event.listen(session.get_bind(), "after_cursor_execute", concurrent_commit, once=True)
+    assert Department.get_snapshot(session, id=test_department).id == test_department
+    assert identity_cache.get("departments", "id", test_department) is MISSING
+
+    assert Department.get_snapshot(session, id=test_department).id == test_department
+    assert identity_cache.get("departments", "id", test_department) is not MISSING
@@ -1,11 +1,17 @@
-from typing import Any, Callable
+from typing import Any, Callable, ContextManager
 
 from fastapi.testclient import TestClient
 from pytest import mark, param
 from pytest_lazyfixture import lazy_fixture
+from sqlalchemy import Row
+from sqlalchemy.orm import Session
+from starlette.responses import Response as StarletteResponse
 from werkzeug.test import Response
 
+from common.abstracts import Pagination
+from common.filters import Sort
 from departments.departments_db import Department
+from departments.departments_rst import ListModel
 
 
 @mark.parametrize(
@@ -67,3 +73,140 @@ def test_update_department(
         assert parent_response.status_code == code
         assert len(parent_response.json().get("children")) != 0
         assert parent_response.json().get("children")[-1] == {"id": second_dep, "name": name}
+
+
+def test_department_hierarchy(client: TestClient):
+    root: int = client.post("/departments/", json={"name": "root"}).json()["id"]
+    left: int = client.post("/departments/", json={"name": "left", "parent_id": root}).json()["id"]
+    right: int = client.post("/departments/", json={"name": "right", "parent_id": root}).json()["id"]
+    leaf: int = client.post("/departments/", json={"name": "leaf", "parent_id": left}).json()["id"]
+    lonely: int = client.post("/departments/", json={"name": "lonely"}).json()["id"]
+
+    subtree: Response = client.get(f"/departments/{left}/subtree/")
+    assert subtree.status_code == 200
+    assert [node["id"] for node in subtree.json()] == [left, leaf]
+
+    ancestors: Response = client.get(f"/departments/{leaf}/ancestors/")
+    assert [node["id"] for node in ancestors.json()] == [left, root]
+
+    path: Response = client.get(f"/departments/{leaf}/path/{right}/")
+    assert [node["id"] for node in path.json()] == [leaf, left, root, right]
+    assert [node["id"] for node in client.get(f"/departments/{root}/path/{leaf}/").json()] == [root, left, leaf]
+
+    assert client.get(f"/departments/{leaf}/path/{lonely}/").status_code == 404
+    assert client.get("/departments/99/subtree/").json() == {"detail": "Department not found"}
+
+
+def test_department_pagination(client: TestClient, department_maker: Callable[[], Department]):
+    created: list[int] = [department_maker().id for _ in range(3)]
+
+    first_page: Response = client.get("/departments/", params={"limit": 2})
+    assert first_page.status_code == 200
+    assert [department["id"] for department in first_page.json()] == created[:2]
+    assert first_page.headers["X-Next-Cursor"] == str(created[1])
+
+    last_page: Response = client.get("/departments/", params={"limit": 2, "after": created[1]})
+    assert [department["id"] for department in last_page.json()] == created[2:]
+    assert "X-Next-Cursor" not in last_page.headers
+
+    assert client.get("/departments/", params={"limit": 100000}).status_code == 422
+
+    schema: dict[str, Any] = client.get("/openapi.json").json()["paths"]["/departments/"]["get"]["responses"]["200"]
+    assert schema["content"]["application/json"]["schema"]["items"] == {
+        "$ref": "#/components/schemas/departments__departments_rst__ListModel"
+    }
+
+
+def test_department_query_count(
+        client: TestClient,
+        max_queries: Callable[[int], ContextManager[list[str]]],
+):
+    root: int = client.post("/departments/", json={"name": "root"}).json()["id"]
+    for number in range(5):
+        client.post("/departments/", json={"name": f"child_{number}", "parent_id": root})
+        client.post("/employees/", json={"name": "John", "surname": "Doe", "department_id": root})
+
+    with max_queries(2):
+        response: Response = client.get(f"/departments/{root}/")
+    assert len(response.json()["children"]) == 5
+    assert len(response.json()["employees"]) == 5
+
+
+def test_department_etag(client: TestClient, test_department: int):
+    first: Response = client.get(f"/departments/{test_department}/")
+    etag: str = first.headers["ETag"]
+
+    cached: Response = client.get(f"/departments/{test_department}/", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.headers["ETag"] == etag
+    assert cached.content == b""
+
+    client.post("/employees/", json={"name": "John", "surname": "Doe", "department_id": test_department})
+    changed: Response = client.get(f"/departments/{test_department}/", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert len(changed.json()["employees"]) == 1
+
+
+def test_department_filters(client: TestClient):
+    root: int = client.post("/departments/", json={"name": "Root"}).json()["id"]
+    for name in ("sales", "Support", "it"):
+        client.post("/departments/", json={"name": name, "parent_id": root})
+
+    def names(**params: Any) -> list[str]:
+        return [department["name"] for department in client.get("/departments/", params=params).json()]
+
+    assert names(parent_id=[root], sort="-name") == ["Support", "sales", "it"]
+    assert names(name="s", sort="name") == ["sales", "Support"]
+    assert names(root=True) == ["Root"]
+    assert names(root=False, name="i") == ["it"]
+
+    for name in ("Zeta", "zulu", "Lizard", "Ärger", "ärmel", "\ud7ff"):
+        client.post("/departments/", json={"name": name})
+    assert names(name="Z", sort="name") == ["Zeta", "zulu"]
+    assert names(name="LIZ") == ["Lizard"]
+    assert names(name="Är") == ["Ärger"]
+    assert names(name="\ud7ff") == ["\ud7ff"]
+    assert names(name=chr(0x10FFFF)) == []
+
+
+def test_department_projection(session: Session, department_maker: Callable[[], Department]):
+    created: list[int] = [department_maker().id for _ in range(3)]
+    page: Pagination = Pagination(StarletteResponse(), limit=2, after=None)
+
+    rows: list[Row] = Department.get_rows(session, page, ListModel, sort=Sort("parent_id", descending=True))
+    assert [row._fields for row in rows] == [("id", "name", "parent_id")] * 2
+    assert [row.id for row in rows] == [created[2], created[1]]
+    assert "X-Next-Cursor" in page.response.headers
+
+
+def test_department_subtree_operations(client: TestClient, max_queries: Callable[[int], ContextManager[list[str]]]):
+    chain: list[int] = [client.post("/departments/", json={"name": "level-0"}).json()["id"]]
+    for level in range(1, 5):
+        chain.append(client.post("/departments/", json={"name": f"level-{level}", "parent_id": chain[-1]}).json()["id"])
+    other: int = client.post("/departments/", json={"name": "other"}).json()["id"]
+    cycle: dict[str, str] = {"detail": "Department cannot be moved into its own subtree"}
+
+    with max_queries(2):
+        assert client.post(f"/departments/{chain[1]}/subtree/move/", json={"parent_id": chain[4]}).json() == cycle
+    assert client.patch(f"/departments/{chain[0]}/", json={"name": "level-0", "parent_id": chain[3]}).json() == cycle
+    assert client.post(f"/departments/{chain[1]}/subtree/move/", json={"parent_id": 99}).status_code == 404
+    assert client.post(f"/departments/{chain[2]}/subtree/move/", json={"parent_id": other}).json() == {"updated": 1}
+    ancestors: list[dict[str, Any]] = client.get(f"/departments/{chain[4]}/ancestors/").json()
+    assert [row["id"] for row in ancestors] == [chain[3], chain[2], other]
+
+    assert client.post(f"/departments/{other}/subtree/archive/", json={}).json() == {"updated": 4}
+    assert [row["name"] for row in client.get("/departments/").json()] == ["level-0", "level-1"]
+    assert len(client.get("/departments/", params={"archived": True}).json()) == 4
+
+    client.post(f"/departments/{chain[3]}/roles/", json={"name": "cook", "permissions": ["kitchen"]})
+    employee: int = client.post(
+        "/employees/",
+        json={"name": "John", "surname": "Doe", "department_id": chain[4], "roles": [{"name": "cook"}]},
+    ).json()["id"]
+    with max_queries(8):
+        assert client.delete(f"/departments/{other}/subtree/").json() == {"updated": 4}
+    assert client.get(f"/departments/{chain[3]}/").status_code == 404
+    assert client.get(f"/employees/{employee}/").json()["department_id"] is None
+    assert client.get(f"/employees/{employee}/permissions/").json()["roles"] == []
+    assert client.delete(f"/departments/{other}/subtree/").status_code == 404
@@ -1,4 +1,4 @@
-from typing import Any
+from typing import Any, Callable, ContextManager
 
 from fastapi.testclient import TestClient
 from pytest import mark, param
@@ -35,7 +35,8 @@ def test_crd_employee(
         "/employees/",
         json={"name": name, "surname": surname, "department_id": department_id, "roles": roles}
     )
-    expected_data: dict[str, Any] = (dict(id=1, roles=roles or [], **expected_data) if code == 200 else expected_data)
+    expected_roles: list[dict[str, str]] = [{"name": role["name"].replace("_", "-")} for role in roles or []]
+    expected_data: dict[str, Any] = dict(id=1, roles=expected_roles, **expected_data) if code == 200 else expected_data
 
     assert result.status_code == code
     assert result.json() == expected_data
@@ -88,8 +89,176 @@ def test_update_employee(
         f"/employees/{test_employee}/",
         json={"name": name, "surname": surname, "department_id": department_id, "roles": roles},
     )
-    roles = [dict(name=role["name"], id=1)] if len(roles) >= 1 else []
+    roles = [dict(name=role["name"].replace("_", "-"), id=1)] if len(roles) >= 1 else []
     expected_data: dict[str, Any] = dict(id=1, roles=roles, **expected_data)
 
     assert result.status_code == code
     assert result.json() == expected_data
+
+
+@mark.parametrize(
+    ("permissions", "check", "allowed"),
+    [
+        param(["coffee_machine"], ["coffee_machine"], True),
+        param(["coffee_machine"], ["coffee_machine", "hall"], False),
+    ],
+)
+def test_employee_permissions(
+        client: TestClient,
+        test_department: int,
+        permissions: list[str],
+        check: list[str],
+        allowed: bool,
+):
+    employee: dict[str, Any] = client.post(
+        "/employees/",
+        json={"name": "John", "surname": "Doe", "department_id": test_department, "roles": [{"name": "test_role"}]},
+    ).json()
+    role_id: int = client.get(f"/departments/{test_department}/roles/").json()[0]["id"]
+
+    empty: Response = client.get(f"/employees/{employee['id']}/permissions/")
+    assert empty.status_code == 200
+    assert empty.json() == {"employee_id": employee["id"], "roles": [role_id], "permissions": []}
+
+    client.patch(f"/departments/{test_department}/roles/{role_id}/", json={"permissions": permissions})
+    granted: Response = client.get(f"/employees/{employee['id']}/permissions/")
+    assert [permission["name"] for permission in granted.json()["permissions"]] == ["coffee-machine"]
+
+    result: Response = client.post(f"/employees/{employee['id']}/permissions/check/", json={"permissions": check})
+    assert result.status_code == 200
+    assert result.json()["allowed"] is allowed
+
+    client.delete(f"/permissions/{granted.json()['permissions'][0]['id']}/")
+    revoked: Response = client.post(f"/employees/{employee['id']}/permissions/check/", json={"permissions": check})
+    assert revoked.json()["allowed"] is False
+
+    assert client.get("/employees/99/permissions/").json() == {"detail": "Employee not found"}
+
+
+def test_employee_query_count(
+        client: TestClient,
+        test_department: int,
+        max_queries: Callable[[int], ContextManager[list[str]]],
+):
+    roles: list[dict[str, str]] = [{"name": f"role_{number}"} for number in range(5)]
+    employee: dict[str, Any] = client.post(
+        "/employees/",
+        json={"name": "John", "surname": "Doe", "department_id": test_department, "roles": roles},
+    ).json()
+
+    with max_queries(2):
+        response: Response = client.get(f"/employees/{employee['id']}/")
+    assert len(response.json()["roles"]) == 5
+
+
+def test_bulk_membership(
+        client: TestClient,
+        max_queries: Callable[[int], ContextManager[list[str]]],
+):
+    source: int = client.post("/departments/", json={"name": "source"}).json()["id"]
+    target: int = client.post("/departments/", json={"name": "target"}).json()["id"]
+    client.post(f"/departments/{source}/roles/", json={"name": "old", "permissions": ["coffee"]})
+    role: int = client.post(
+        f"/departments/{target}/roles/", json={"name": "new", "permissions": ["printer"]}
+    ).json()["id"]
+    employees: list[int] = [
+        client.post(
+            "/employees/",
+            json={"name": "John", "surname": str(index), "department_id": source, "roles": [{"name": "old"}]},
+        ).json()["id"]
+        for index in range(5)
+    ]
+
+    with max_queries(4):
+        result: Response = client.post(
+            f"/departments/{target}/employees/move/",
+            json={"employee_ids": [*employees, 99], "keep_roles": False},
+        )
+    assert result.json() == {"updated": 5, "missing": [99]}
+    assert client.get(f"/employees/{employees[0]}/").json()["department_id"] == target
+    assert client.get(f"/employees/{employees[0]}/permissions/").json()["permissions"] == []
+
+    with max_queries(5):
+        result = client.post(f"/departments/{target}/roles/{role}/employees/assign/", json={"employee_ids": employees})
+    assert result.json() == {"updated": 5, "missing": []}
+    assert client.get(f"/employees/{employees[0]}/permissions/").json()["permissions"] == [
+        {"id": 2, "name": "printer"}
+    ]
+
+    result = client.post(f"/departments/{target}/roles/{role}/employees/revoke/", json={"employee_ids": employees[:2]})
+    assert result.json() == {"updated": 2, "missing": []}
+    assert [
+        len(client.get(f"/employees/{employee_id}/permissions/").json()["permissions"]) for employee_id in employees
+    ] == [0, 0, 1, 1, 1]
+
+    assert client.post(f"/departments/{source}/roles/{role}/employees/assign/", json={"employee_ids": [1]}).json() == {
+        "detail": "Role not found"
+    }
+
+
+@mark.parametrize("api", [lazy_fixture("client"), lazy_fixture("async_client")])
+def test_employee_filters(api: TestClient, test_department: int):
+    other: int = api.post("/departments/", json={"name": "other"}).json()["id"]
+    api.post(f"/departments/{test_department}/roles/", json={"name": "cook", "permissions": ["kitchen"]})
+    people: list[tuple[str, str, int, list[dict[str, str]]]] = [
+        ("anna", "Zeta", test_department, [{"name": "cook"}]),
+        ("Andrew", "Alpha", test_department, []),
+        ("bob", "Beta", other, []),
+        ("Anton", "Gamma", other, []),
+    ]
+    for name, surname, department_id, roles in people:
+        api.post("/employees/", json={"name": name, "surname": surname, "department_id": department_id, "roles": roles})
+
+    def names(**params: Any) -> list[str]:
+        return [employee["name"] for employee in api.get("/employees/", params=params).json()]
+
+    assert names(name="an") == ["anna", "Andrew", "Anton"]
+    assert names(name="AN", department_id=[other]) == ["Anton"]
+    assert names(department_id=[test_department, other], sort="name") == ["Andrew", "anna", "Anton", "bob"]
+    assert names(sort="-surname") == ["anna", "Anton", "bob", "Andrew"]
+    assert names(role_id=[1]) == names(permission=["Kitchen"]) == ["anna"]
+    assert names(permission=["hall"]) == []
+    assert api.get("/employees/", params={"sort": "department_id"}).status_code == 422
+
+    first: Response = api.get("/employees/", params={"sort": "name", "limit": 3})
+    assert [employee["name"] for employee in first.json()] == ["Andrew", "anna", "Anton"]
+    assert names(sort="name", limit=3, after=first.headers["X-Next-Cursor"]) == ["bob"]
+    assert api.get("/employees/", params={"sort": "name", "after": "garbage"}).json() == {"detail": "Invalid cursor"}
+
+
+def test_permission_batch_check(
+        client: TestClient,
+        test_department: int,
+        max_queries: Callable[[int], ContextManager[list[str]]],
+):
+    cook: int = client.post(
+        f"/departments/{test_department}/roles/", json={"name": "cook", "permissions": ["kitchen", "hall"]}
+    ).json()["id"]
+    client.post(f"/departments/{test_department}/roles/", json={"name": "guard", "permissions": ["door"]})
+    anna: int = client.post(
+        "/employees/",
+        json={"name": "Anna", "surname": "Doe", "department_id": test_department, "roles": [{"name": "cook"}]},
+    ).json()["id"]
+    bob: int = client.post("/employees/", json={"name": "Bob", "surname": "Doe", "department_id": None}).json()["id"]
+    checks: list[list[Any]] = [[anna, "Kitchen"], [anna, "door"], [bob, "hall"], [99, "hall"], [anna, "nope"]]
+
+    def check() -> dict[str, Any]:
+        return client.post("/permissions/check/batch/", json={"checks": checks}).json()
+
+    assert check() == {"allowed": [True, False, False, False, False], "unknown_employees": [99]}
+    with max_queries(1):
+        assert check()["allowed"] == [True, False, False, False, False]
+
+    client.patch(f"/departments/{test_department}/roles/{cook}/", json={"permissions": ["kitchen", "door"]})
+    assert check()["allowed"] == [True, True, False, False, False]
+
+    client.patch(
+        f"/employees/{anna}/",
+        json={"name": "Anna", "surname": "Doe", "department_id": test_department, "roles": [{"name": "guard"}]},
+    )
+    assert check()["allowed"] == [False, True, False, False, False]
+
+    door: int = next(row["id"] for row in client.get("/permissions/").json() if row["name"] == "door")
+    client.delete(f"/permissions/{door}/")
+    assert check()["allowed"] == [False, False, False, False, False]
+    assert client.post("/permissions/check/batch/", json={"checks": []}).status_code == 422
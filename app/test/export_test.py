@@ -0,0 +1,69 @@
+from json import loads
+from sqlite3 import connect
+from typing import Any, Callable, ContextManager
+
+from fastapi.testclient import TestClient
+from pytest import mark, param
+from werkzeug.test import Response
+
+
+@mark.parametrize(
+    ("export_format", "media_type"),
+    [param("ndjson", "application/x-ndjson"), param("csv", "text/csv")],
+)
+def test_export_org(client: TestClient, test_department: int, export_format: str, media_type: str):
+    client.post(
+        "/employees/",
+        json={"name": "John", "surname": "Doe", "department_id": test_department, "roles": [{"name": "test_role"}]},
+    )
+    result: Response = client.get("/export/", params={"format": export_format})
+
+    assert result.status_code == 200
+    assert result.headers["content-type"].startswith(media_type)
+
+    lines: list[str] = result.text.splitlines()
+    if export_format == "csv":
+        assert lines[0] == "type,key,name,surname,parent,department,employee,role,permission"
+        assert lines[1:] == [
+            "department,1,test_name,,,,,,",
+            "role,1,test-role,,,1,,,",
+            "employee,1,John,Doe,,1,,,",
+            "employee_role,,,,,,1,1,",
+        ]
+        return
+    expected: list[dict[str, Any]] = [
+        {"type": "department", "key": 1, "name": "test_name", "parent": None},
+        {"type": "role", "key": 1, "name": "test-role", "department": 1},
+        {"type": "employee", "key": 1, "name": "John", "surname": "Doe", "department": 1},
+        {"type": "employee_role", "employee": 1, "role": 1},
+    ]
+    assert [loads(line) for line in lines] == expected
+
+
+def test_export_round_trip(client: TestClient, max_queries: Callable[[int], ContextManager[list[str]]]):
+    child: int = client.post("/departments/", json={"name": "child"}).json()["id"]
+    parent: int = client.post("/departments/", json={"name": "parent"}).json()["id"]
+    client.post("/departments/", json={"name": "leaf", "parent_id": child})
+    client.post(f"/departments/{child}/subtree/move/", json={"parent_id": parent})
+
+    with max_queries(7) as statements:
+        result: Response = client.get("/export/")
+    assert statements[0] == "BEGIN"
+    departments: list[dict[str, Any]] = [
+        record for record in map(loads, result.text.splitlines()) if record["type"] == "department"
+    ]
+    assert [record["name"] for record in departments] == ["parent", "child", "leaf"]
+
+    imported: Response = client.post("/import/", params={"chunk_size": 1}, content=result.text)
+    assert imported.json()["failed"] == 0
+    assert imported.json()["imported"]["department"] == 3
+
+    looped: int = client.post("/departments/", json={"name": "looped"}).json()["id"]
+    below: int = client.post("/departments/", json={"name": "below", "parent_id": looped}).json()["id"]
+    with connect("./instance/test.db") as legacy:
+        legacy.execute("UPDATE departments SET parent_id = ? WHERE id = ?", (below, looped))
+    exported: list[dict[str, Any]] = [
+        record for record in map(loads, client.get("/export/").text.splitlines()) if record["type"] == "department"
+    ]
+    assert len(exported) == 8
+    assert [(record["key"], record["parent"]) for record in exported[-2:]] == [(looped, below), (below, looped)]
@@ -0,0 +1,92 @@
+from json import dumps
+from typing import Any
+
+from fastapi.testclient import TestClient
+from werkzeug.test import Response
+
+RECORDS: list[dict[str, Any]] = [
+    {"type": "department", "key": "hq", "name": "Headquarters"},
+    {"type": "department", "key": "it", "name": "IT", "parent": "hq"},
+    {"type": "permission", "key": "coffee", "name": "Coffee_Machine"},
+    {"type": "role", "key": "admin", "name": "admin", "department": "it"},
+    {"type": "employee", "key": "john", "name": "John", "surname": "Doe", "department": "it"},
+    {"type": "employee_role", "employee": "john", "role": "admin"},
+    {"type": "role_permission", "role": "admin", "permission": "coffee"},
+    {"type": "employee", "key": "jane", "name": "Jane", "surname": "Doe", "department": "sales"},
+    {"type": "unknown"},
+]
+
+
+def test_import_org(client: TestClient):
+    body: str = "\n".join(dumps(record) for record in RECORDS) + "\nnot json"
+    result: Response = client.post("/import/", params={"chunk_size": 3}, content=body)
+
+    assert result.status_code == 200
+    assert result.json()["imported"] == {
+        "department": 2,
+        "permission": 1,
+        "role": 1,
+        "employee": 1,
+        "employee_role": 1,
+        "role_permission": 1,
+    }
+    assert result.json()["failed"] == 3
+    assert sorted(error["line"] for error in result.json()["errors"]) == [8, 9, 10]
+
+    it: dict[str, Any] = client.get("/departments/2/").json()
+    assert it["parent_id"] == 1
+    assert it["employees"] == [{"id": 1, "name": "John", "surname": "Doe"}]
+
+    permissions: Response = client.get("/employees/1/permissions/")
+    assert permissions.json()["permissions"] == [{"id": 1, "name": "coffee-machine"}]
+
+
+def test_import_merges_roles(client: TestClient, test_department: int):
+    records: list[dict[str, Any]] = [
+        {"type": "department", "key": "hq", "name": "Headquarters"},
+        {"type": "role", "key": "first", "name": "Admin", "department": "hq"},
+        {"type": "role", "key": "second", "name": "admin", "department": "hq"},
+    ]
+    result: Response = client.post("/import/", content="\n".join(dumps(record) for record in records))
+
+    assert result.json()["failed"] == 0
+    assert client.get("/departments/2/roles/").json() == [{"id": 1, "name": "admin"}]
+
+
+def test_import_refreshes_batch_checks(client: TestClient, test_department: int):
+    client.post(f"/departments/{test_department}/roles/", json={"name": "cook", "permissions": ["kitchen"]})
+    cook: int = client.post(
+        "/employees/",
+        json={"name": "Anna", "surname": "Doe", "department_id": test_department, "roles": [{"name": "cook"}]},
+    ).json()["id"]
+    assert client.post("/permissions/check/batch/", json={"checks": [[cook, "kitchen"]]}).json()["allowed"] == [True]
+
+    client.post("/import/", content="\n".join(dumps(record) for record in RECORDS[:7]))
+    john: int = client.get("/employees/", params={"name": "John"}).json()[0]["id"]
+    single: Response = client.post(f"/employees/{john}/permissions/check/", json={"permissions": ["coffee_machine"]})
+    assert single.json()["allowed"] is True
+    assert client.post(
+        "/permissions/check/batch/", json={"checks": [[john, "coffee_machine"], [cook, "kitchen"]]}
+    ).json()["allowed"] == [True, True]
+
+
+def test_import_rejects_department_cycles(client: TestClient):
+    records: list[dict[str, Any]] = [
+        {"type": "department", "key": "self", "name": "Self", "parent": "self"},
+        {"type": "department", "key": "a", "name": "A", "parent": "b"},
+        {"type": "department", "key": "b", "name": "B", "parent": "a"},
+        {"type": "department", "key": "below", "name": "Below", "parent": "a"},
+        {"type": "department", "key": "leaf", "name": "Leaf", "parent": "root"},
+        {"type": "department", "key": "root", "name": "Root"},
+    ]
+    result: Response = client.post("/import/", content="\n".join(dumps(record) for record in records))
+
+    assert result.json()["imported"]["department"] == 2
+    assert sorted((error["line"], error["detail"]) for error in result.json()["errors"]) == [
+        (1, "Department cycle: self"),
+        (2, "Department cycle: a"),
+        (3, "Department cycle: b"),
+        (4, "Unknown department: a"),
+    ]
+    assert [row["name"] for row in client.get("/departments/", params={"root": True}).json()] == ["Root"]
+    assert [row["name"] for row in client.get("/departments/", params={"root": False}).json()] == ["Leaf"]
@@ -0,0 +1,46 @@
+from typing import Any
+
+from fastapi.testclient import TestClient
+from werkzeug.test import Response
+
+from common.metrics import request_metrics
+from common.slow_queries import fingerprint, slow_query_log
+from main import create_app
+
+
+def test_request_metrics(client: TestClient, async_client: TestClient, test_department: int):
+    request_metrics.clear()
+    for test_client in (client, async_client):
+        result: Response = test_client.get(f"/departments/{test_department}/roles/")
+        assert result.status_code == 200
+        assert result.headers["Server-Timing"].startswith('db;desc="')
+        assert "app;dur=" in result.headers["Server-Timing"]
+
+    client.get("/departments/99/roles/")
+    metrics: str = client.get("/metrics").text
+    labels: str = 'method="GET",route="/departments/{department_id}/roles/"'
+    assert f'http_request_duration_seconds_count{{{labels}}} 3' in metrics
+    assert f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} 3' in metrics
+    assert f'http_requests_total{{{labels},status="404"}} 1' in metrics
+    assert f"http_request_db_queries_total{{{labels}}} " in metrics
+
+
+def test_slow_query_log(client: TestClient, test_department: int, monkeypatch):
+    monkeypatch.setattr(slow_query_log, "threshold", 0)
+    slow_query_log.clear()
+    client.get("/employees/", params={"limit": 5})
+
+    slow_queries: list[dict[str, Any]] = client.get("/debug/slow-queries/", params={"limit": 100}).json()
+    employees: dict[str, Any] = next(query for query in slow_queries if "FROM employees" in query["fingerprint"])
+    assert employees["route"] == "/employees/"
+    assert "LIMIT ?" in employees["fingerprint"]
+    assert any("employees" in step for step in employees["plan"])
+
+    assert fingerprint("SELECT * FROM t WHERE id IN (?, ?, ?) AND name = 'x'") == \
+        "SELECT * FROM t WHERE id IN (?, ...) AND name = ?"
+
+
+def test_debug_endpoints_disabled_by_default():
+    debug_client: TestClient = TestClient(create_app())
+    assert debug_client.get("/debug/cache/").status_code == 404
+    assert debug_client.get("/debug/slow-queries/").status_code == 404
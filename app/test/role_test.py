@@ -1,15 +1,19 @@
-from typing import Any
+from typing import Any, Callable, ContextManager
 
 from fastapi.testclient import TestClient
 from pytest import mark, param
+from pytest_lazyfixture import lazy_fixture
 from werkzeug.test import Response
 
-TEST_DATA = {"id": 1, "name": "test_role", "permissions": [{"id": 1, "name": "coffee_machine"}]}
+TEST_DATA = {"id": 1, "name": "test-role", "permissions": [{"id": 1, "name": "coffee-machine"}]}
 
 
 @mark.parametrize(
     ("name", "permissions", "code", "expected_data"),
-    [param(TEST_DATA["name"], [TEST_DATA["permissions"][-1]["name"]], 200, TEST_DATA)],
+    [
+        param(TEST_DATA["name"], [TEST_DATA["permissions"][-1]["name"]], 200, TEST_DATA),
+        param("Test_Role", ["coffee_machine", "Coffee Machine"], 200, TEST_DATA),
+    ],
 )
 def test_crd_role(
         client: TestClient,
@@ -42,7 +46,7 @@ def test_crd_role(
             "new_name",
             [TEST_DATA["permissions"][-1]["name"]],
             200,
-            dict(id=TEST_DATA["id"], name="new_name", permissions=TEST_DATA["permissions"])
+            dict(id=TEST_DATA["id"], name="new-name", permissions=TEST_DATA["permissions"])
         )
     ],
 )
@@ -113,7 +117,7 @@ def test_not_found_exceptions(
 @mark.parametrize(
     ("name", "code", "expected_data"),
     [
-        param("test_permission", 200, {"id": 1, "name": "test_permission"}),
+        param("test_permission", 200, {"id": 1, "name": "test-permission"}),
     ]
 )
 def test_permissions(
@@ -135,3 +139,41 @@ def test_permissions(
     deleting: Response = client.delete(f"/permissions/{expected_data.get('id')}/")
     assert deleting.status_code == code
     assert len(client.get("/permissions/").json()) == 0
+
+
+def test_department_identity_cache(
+        client: TestClient,
+        test_department: int,
+        max_queries: Callable[[int], ContextManager[list[str]]],
+):
+    assert client.get(f"/departments/{test_department}/roles/").status_code == 200
+    hits: int = client.get("/debug/cache/").json()["hits"]
+    with max_queries(1):
+        assert client.get(f"/departments/{test_department}/roles/").status_code == 200
+    assert client.get("/debug/cache/").json()["hits"] == hits + 1
+
+    new_id: int = test_department + 1
+    assert client.get(f"/departments/{new_id}/roles/").status_code == 404
+    assert client.post("/departments/", json={"name": "cached", "parent_id": None}).json()["id"] == new_id
+    assert client.get(f"/departments/{new_id}/roles/").status_code == 200
+
+    client.delete(f"/departments/{new_id}/")
+    assert client.get(f"/departments/{new_id}/roles/").status_code == 404
+
+
+@mark.parametrize("api", [lazy_fixture("client"), lazy_fixture("async_client")])
+def test_rename_role(api: TestClient, test_department: int):
+    api.post(f"/departments/{test_department}/roles/", json={"name": "admin"})
+    role: int = api.post(f"/departments/{test_department}/roles/", json={"name": "guest"}).json()["id"]
+
+    for name in ("Admin", "admin", " ADMIN "):
+        result: Response = api.patch(f"/departments/{test_department}/roles/{role}/", json={"name": name})
+        assert result.status_code == 409
+        assert result.json() == {"detail": "Role already exists"}
+
+    renamed: Response = api.patch(f"/departments/{test_department}/roles/{role}/", json={"name": "Power User"})
+    assert renamed.json()["name"] == "power-user"
+    assert api.patch(f"/departments/{test_department}/roles/{role}/", json={"name": "power_user"}).status_code == 200
+    assert sorted(row["name"] for row in api.get(f"/departments/{test_department}/roles/").json()) == [
+        "admin", "power-user"
+    ]
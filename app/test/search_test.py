@@ -0,0 +1,41 @@
+from typing import Any
+
+from fastapi.testclient import TestClient
+from werkzeug.test import Response
+
+
+def search(client: TestClient, **params: Any) -> list[tuple[str, str]]:
+    result: Response = client.get("/search/", params=params)
+    assert result.status_code == 200
+    return [(row["kind"], row["title"]) for row in result.json()]
+
+
+def test_search(client: TestClient):
+    department: int = client.post("/departments/", json={"name": "Ivanovo office"}).json()["id"]
+    client.post(f"/departments/{department}/roles/", json={"name": "Ivan's deputy"})
+    employees: list[int] = [
+        client.post("/employees/", json={"name": name, "surname": surname, "department_id": None}).json()["id"]
+        for name, surname in (("Ivan", "Petrov"), ("Petr", "Ivanov"), ("Anna", "Ivanova"), ("Olga", "Smirnova"))
+    ]
+
+    assert search(client, q="iva", kind="employee") == [
+        ("employee", "Ivan Petrov"), ("employee", "Petr Ivanov"), ("employee", "Anna Ivanova"),
+    ]
+    assert {kind for kind, _ in search(client, q="Iva")} == {"employee", "department", "role"}
+    assert search(client, q="ivan petr") == [("employee", "Ivan Petrov"), ("employee", "Petr Ivanov")]
+    assert search(client, q="iva", kind="employee", limit=1, offset=2) == [("employee", "Anna Ivanova")]
+    assert search(client, q="?!") == []
+
+    client.patch(f"/employees/{employees[3]}/", json={"name": "Olga", "surname": "Ivanchenko", "department_id": None})
+    client.delete(f"/employees/{employees[0]}/")
+    assert search(client, q="ivanch") == [("employee", "Olga Ivanchenko")]
+    assert ("employee", "Ivan Petrov") not in search(client, q="ivan")
+
+
+def test_search_follows_renames(client: TestClient):
+    department: int = client.post("/departments/", json={"name": "kitchen"}).json()["id"]
+    role: int = client.post(f"/departments/{department}/roles/", json={"name": "cook"}).json()["id"]
+
+    assert client.patch(f"/departments/{department}/roles/{role}/", json={"name": "chef"}).status_code == 200
+    assert search(client, q="chef", kind="role") == [("role", "chef")]
+    assert search(client, q="cook", kind="role") == []